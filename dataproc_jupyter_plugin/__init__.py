@@ -19,6 +19,7 @@ from kernels_mixer.kernels import MixingMappingKernelManager
 from kernels_mixer.kernelspecs import MixingKernelSpecManager
 from kernels_mixer.websockets import DelegatingWebsocketConnection
 
+from .commons import blocking, constants, sessions, templates
 from .handlers import DataprocPluginConfig, configure_gateway_client_url, setup_handlers
 
 
@@ -75,6 +76,18 @@ def _link_jupyter_server_extension(server_app):
     c.GatewayClient.auth_token = "Initial, invalid value"
 
 
+def _close_on_shutdown(server_app, close):
+    # Module-based server extensions do not get a shutdown hook of their own,
+    # so we run ours as part of the server's extension cleanup.
+    cleanup_extensions = server_app.cleanup_extensions
+
+    async def _cleanup_extensions():
+        await close()
+        await cleanup_extensions()
+
+    server_app.cleanup_extensions = _cleanup_extensions
+
+
 def _load_jupyter_server_extension(server_app):
     """Registers the API handler to receive HTTP requests from the frontend extension.
 
@@ -83,6 +96,25 @@ def _load_jupyter_server_extension(server_app):
     server_app: jupyterlab.labapp.LabApp
         JupyterLab application instance
     """
+    plugin_config = DataprocPluginConfig.instance(parent=server_app)
+    server_app.web_app.settings[constants.PLUGIN_CONFIG_SETTINGS_KEY] = plugin_config
+    session_manager = sessions.ClientSessionManager(
+        server_app.log,
+        plugin_config.http_connection_limit,
+        plugin_config.http_connection_limit_per_host,
+        plugin_config.http_keepalive_timeout,
+        plugin_config.http_dns_cache_ttl,
+    )
+    server_app.web_app.settings[sessions.SETTINGS_KEY] = session_manager
+    blocking.configure(plugin_config.blocking_call_max_workers)
+
+    async def _close():
+        await session_manager.close()
+        blocking.shutdown()
+
+    _close_on_shutdown(server_app, _close)
+    templates.load()
+
     setup_handlers(server_app.web_app)
     name = "dataproc_jupyter_plugin"
     server_app.log.info(f"Registered {name} server extension")
@@ -0,0 +1,125 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of worker threads used when `configure` has not been called, e.g.
+# in unit tests.
+DEFAULT_MAX_WORKERS = 8
+
+
+class BlockingCallExecutor:
+    """Runs blocking google-cloud SDK calls on a bounded thread pool.
+
+    The SDK clients for Cloud Storage, Compute Engine and Cloud Logging are
+    synchronous. Calling them directly from a handler would stall the Tornado
+    event loop, and with it every other request to the Jupyter server.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="dataproc-plugin-blocking"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _call(self, submitted, func):
+        wait = time.monotonic() - submitted
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    async def run(self, func, *args, **kwargs):
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(
+            self._call, time.monotonic(), functools.partial(func, *args, **kwargs)
+        )
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call cancelled before it started never leaves the queue itself.
+            if future.cancelled():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def metrics(self):
+        with self._lock:
+            started = self._active + self._completed
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "active": self._active,
+                "completed": self._completed,
+                "average_wait_seconds": (
+                    self._total_wait / started if started else 0.0
+                ),
+                "max_wait_seconds": self._max_wait,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_executor = None
+
+
+def configure(max_workers):
+    """Replaces the shared executor with one using the given pool size."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+    _executor = BlockingCallExecutor(max_workers)
+    return _executor
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = BlockingCallExecutor(DEFAULT_MAX_WORKERS)
+    return _executor
+
+
+async def run(func, *args, **kwargs):
+    """Runs `func(*args, **kwargs)` on the shared thread pool."""
+    return await get_executor().run(func, *args, **kwargs)
+
+
+def metrics():
+    return get_executor().metrics()
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
@@ -33,6 +33,9 @@ STORAGE_SERVICE_DEFAULT_URL = "https://storage.googleapis.com/storage/v1/"
 WRAPPER_PAPPERMILL_FILE = "wrapper_papermill.py"
 VERTEX_STORAGE_BUCKET = "vertex-schedules"
 
+# Key under which the `DataprocPluginConfig` is stored in the web app settings.
+PLUGIN_CONFIG_SETTINGS_KEY = "dataproc_plugin_config"
+
 #######################################################
 # Regular expressions used for validating user input: #
 #######################################################
@@ -56,3 +59,7 @@ DAG_RUN_ID_REGEXP = re.compile("[a-zA-Z0-9_:\\+.-]+")
 
 # This matches the requirements set by the scheduler form.
 AIRFLOW_JOB_REGEXP = re.compile("[a-zA-Z0-9_-]+")
+
+# Vertex notebook execution job IDs are numeric, but we only need to make sure
+#  they are safe to use as a directory name.
+VERTEX_JOB_RUN_ID_REGEXP = re.compile("[a-zA-Z0-9_-]+")
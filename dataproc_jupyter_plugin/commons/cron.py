@@ -0,0 +1,50 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+
+from cron_descriptor import get_description
+
+# Most schedules share a handful of cron expressions, so a small cache is
+# enough to avoid re-parsing them on every list request.
+CRON_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=CRON_CACHE_SIZE)
+def normalize_cron(cron):
+    """Splits a Vertex cron string into its time zone and cron expression.
+
+    Vertex schedules may prefix the expression with a time zone, e.g.
+    `TZ=America/New_York 0 * * * *`. The time zone is `None` when there is
+    no prefix.
+    """
+    cron = " ".join(cron.split())
+    if cron.startswith("TZ=") or cron.startswith("CRON_TZ="):
+        prefix, expression = cron.split(" ", 1)
+        return prefix.split("=", 1)[1], expression
+    return None, cron
+
+
+@functools.lru_cache(maxsize=CRON_CACHE_SIZE)
+def describe_cron(cron, max_run_count=None):
+    """Returns a human readable description of a Vertex schedule's cron."""
+    _, expression = normalize_cron(cron)
+    if max_run_count == "1" and expression == "* * * * *":
+        return "run once"
+    return get_description(expression)
+
+
+def cache_clear():
+    normalize_cron.cache_clear()
+    describe_cron.cache_clear()
@@ -0,0 +1,124 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import zipfile
+
+from dataproc_jupyter_plugin.commons import blocking
+
+ZIP_CHUNK_SIZE = 1024 * 1024
+
+
+class _Buffer:
+    """Write-only file object that holds bytes until they are sent."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        return
+
+    def pop(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ZipStream:
+    """Writes a zip archive to a request handler while it is being built.
+
+    Files are compressed a chunk at a time and each chunk is flushed to the
+    client straight away, so memory use does not depend on the file sizes.
+    """
+
+    def __init__(self, handler):
+        self._handler = handler
+        self._buffer = _Buffer()
+        self._zip = zipfile.ZipFile(self._buffer, "w", zipfile.ZIP_DEFLATED)
+
+    async def _flush(self):
+        data = self._buffer.pop()
+        if data:
+            self._handler.write(data)
+            await self._handler.flush()
+
+    async def add_file(self, file_path, arcname):
+        with open(file_path, "rb") as source, self._zip.open(
+            arcname, "w", force_zip64=True
+        ) as dest:
+            while True:
+                chunk = await blocking.run(source.read, ZIP_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await blocking.run(dest.write, chunk)
+                await self._flush()
+        await self._flush()
+
+    async def add_bytes(self, data, arcname):
+        self._zip.writestr(arcname, data)
+        await self._flush()
+
+    async def close(self):
+        self._zip.close()
+        await self._flush()
+
+
+def download_concurrency(requested, limit):
+    """Returns the number of downloads to run at once, capped at `limit`."""
+    concurrency = int(requested)
+    if concurrency < 1:
+        raise ValueError(f"Invalid concurrency: {requested}")
+    return min(concurrency, limit)
+
+
+async def stream_progress(handler, results, total):
+    """Writes one JSON line per finished download as the results arrive."""
+    handler.set_header("Content-Type", "application/x-ndjson")
+    completed = 0
+    async for result in results:
+        completed += 1
+        handler.write(
+            json.dumps({**result, "completed": completed, "total": total}) + "\n"
+        )
+        await handler.flush()
+    handler.finish()
+
+
+async def stream_zip(handler, results, root_dir, file_name):
+    """Streams downloaded files to the client as a zip archive.
+
+    Each file is removed once it has been added to the archive. The archive
+    ends with a `manifest.json` listing the result for every requested file,
+    including the ones that failed to download.
+    """
+    handler.set_header("Content-Type", "application/zip")
+    handler.set_header("Content-Disposition", f'attachment; filename="{file_name}"')
+    zip_stream = ZipStream(handler)
+    manifest = []
+    async for result in results:
+        file_path = result.pop("file_path")
+        result["archive_path"] = os.path.relpath(file_path, root_dir)
+        if "error" not in result:
+            await zip_stream.add_file(file_path, result["archive_path"])
+            os.remove(file_path)
+        manifest.append(result)
+        handler.log.info(f"{file_name}: {len(manifest)} files done, {result}")
+    await zip_stream.add_bytes(json.dumps(manifest, indent=2), "manifest.json")
+    await zip_stream.close()
+    handler.finish()
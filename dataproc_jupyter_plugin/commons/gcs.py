@@ -0,0 +1,255 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import hashlib
+import os
+
+import aiofiles
+import cachetools
+import google_crc32c
+from google.cloud import storage
+
+from dataproc_jupyter_plugin.commons import blocking, tasks
+
+# Executed notebooks with embedded plots can be hundreds of megabytes, so they
+# are downloaded in ranged reads of this size rather than in one request.
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+PARTIAL_DOWNLOAD_SUFFIX = ".part"
+
+# Default number of output notebooks fetched at once by the bulk download APIs.
+OUTPUT_DOWNLOAD_CONCURRENCY = 4
+
+# Files larger than this are uploaded as parts in parallel and then composed
+# into the destination object.
+COMPOSITE_UPLOAD_THRESHOLD = 32 * 1024 * 1024
+COMPOSITE_UPLOAD_PART_SIZE = 16 * 1024 * 1024
+COMPOSITE_UPLOAD_CONCURRENCY = 4
+# GCS can compose at most 32 source objects in a single request.
+MAX_COMPOSE_COMPONENTS = 32
+
+# Progress of recent uploads, keyed by the `gs://` URI of the destination.
+_upload_progress = cachetools.TTLCache(maxsize=1024, ttl=600)
+
+# CRC32C of local files, keyed by path, size and modification time, so an
+# unchanged notebook is only hashed once.
+_file_checksums = cachetools.LRUCache(maxsize=1024)
+
+
+def _checksum(blob):
+    """Returns a hasher for `blob` and the digest it is expected to produce.
+
+    CRC32C is preferred since GCS records it for every object, while composite
+    objects have no MD5 hash.
+    """
+    if blob.crc32c:
+        return google_crc32c.Checksum(), base64.b64decode(blob.crc32c)
+    if blob.md5_hash:
+        return hashlib.md5(), base64.b64decode(blob.md5_hash)
+    return None, None
+
+
+def _hash_file(hasher, file_name, chunk_size):
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+
+
+async def download_to_file(
+    credentials,
+    bucket_name,
+    blob_name,
+    destination_file_name,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+):
+    """Streams a GCS object to a local file and verifies its checksum.
+
+    Data is written to a `.part` file next to the destination, which is only
+    renamed into place once the whole object has been read and its checksum
+    matches. If a partial file for the same object generation already exists,
+    the download resumes from its end.
+    """
+
+    def _get_blob():
+        storage_client = storage.Client(credentials=credentials)
+        blob = storage_client.bucket(bucket_name).blob(blob_name)
+        blob.reload()
+        return blob
+
+    blob = await blocking.run(_get_blob)
+    partial_file_name = (
+        f"{destination_file_name}.{blob.generation}{PARTIAL_DOWNLOAD_SUFFIX}"
+    )
+    hasher, expected_digest = _checksum(blob)
+
+    offset = 0
+    if os.path.exists(partial_file_name):
+        offset = os.path.getsize(partial_file_name)
+        if offset > blob.size:
+            os.remove(partial_file_name)
+            offset = 0
+        elif offset and hasher is not None:
+            await blocking.run(_hash_file, hasher, partial_file_name, chunk_size)
+
+    def _download_chunk(start):
+        end = min(start + chunk_size, blob.size) - 1
+        chunk = blob.download_as_bytes(
+            start=start,
+            end=end,
+            checksum=None,
+            if_generation_match=blob.generation,
+        )
+        if hasher is not None:
+            hasher.update(chunk)
+        return chunk
+
+    async with aiofiles.open(partial_file_name, "ab") as f:
+        while offset < blob.size:
+            chunk = await blocking.run(_download_chunk, offset)
+            if not chunk:
+                raise IOError(
+                    f"Unexpected end of gs://{bucket_name}/{blob_name} at byte {offset}"
+                )
+            await f.write(chunk)
+            offset += len(chunk)
+
+    if hasher is not None and hasher.digest() != expected_digest:
+        os.remove(partial_file_name)
+        raise IOError(f"Checksum mismatch for gs://{bucket_name}/{blob_name}")
+    os.replace(partial_file_name, destination_file_name)
+
+
+def upload_progress():
+    """Returns the progress of uploads that are running or finished recently."""
+    return {uri: dict(progress) for uri, progress in _upload_progress.items()}
+
+
+def _crc32c(data):
+    return base64.b64encode(google_crc32c.Checksum(data).digest()).decode()
+
+
+async def file_crc32c(file_path, stat=None):
+    """Returns the base64 encoded CRC32C of a local file, as GCS reports it."""
+    stat = stat or os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_checksums:
+        hasher = google_crc32c.Checksum()
+        await blocking.run(_hash_file, hasher, file_path, DOWNLOAD_CHUNK_SIZE)
+        _file_checksums[key] = base64.b64encode(hasher.digest()).decode()
+    return _file_checksums[key]
+
+
+async def _is_unchanged(bucket, blob_name, checksum):
+    existing = await blocking.run(bucket.get_blob, blob_name)
+    return existing is not None and existing.crc32c == checksum
+
+
+async def upload_string(bucket_name, blob_name, data, credentials=None):
+    """Uploads `data` to GCS unless the object already holds the same bytes.
+
+    Returns whether an upload was made.
+    """
+    data = data.encode() if isinstance(data, str) else data
+    storage_client = await blocking.run(storage.Client, credentials=credentials)
+    bucket = storage_client.bucket(bucket_name)
+    if await _is_unchanged(bucket, blob_name, _crc32c(data)):
+        return False
+    await blocking.run(bucket.blob(blob_name).upload_from_string, data)
+    return True
+
+
+def _part_size(size):
+    return max(
+        COMPOSITE_UPLOAD_PART_SIZE,
+        -(-size // MAX_COMPOSE_COMPONENTS),
+    )
+
+
+async def upload_file(
+    bucket_name,
+    blob_name,
+    file_path,
+    credentials=None,
+    threshold=COMPOSITE_UPLOAD_THRESHOLD,
+    concurrency=COMPOSITE_UPLOAD_CONCURRENCY,
+):
+    """Uploads a local file to GCS, in parallel parts if it is large.
+
+    Files above `threshold` are split into parts that are uploaded
+    concurrently and then composed into the destination object. Part names are
+    derived from the file's size and modification time, and a part that is
+    already in the bucket with a matching CRC32C is not uploaded again, so
+    retrying a failed upload resumes it. Progress is available through
+    `upload_progress` while the upload runs.
+
+    Nothing is uploaded if the object already has the file's CRC32C. Returns
+    whether an upload was made.
+    """
+    uri = f"gs://{bucket_name}/{blob_name}"
+    stat = os.stat(file_path)
+    progress = {"uploaded_bytes": 0, "total_bytes": stat.st_size, "state": "running"}
+    _upload_progress[uri] = progress
+    storage_client = await blocking.run(storage.Client, credentials=credentials)
+    bucket = storage_client.bucket(bucket_name)
+    try:
+        checksum = await file_crc32c(file_path, stat)
+        if await _is_unchanged(bucket, blob_name, checksum):
+            progress["uploaded_bytes"] = stat.st_size
+            progress["state"] = "unchanged"
+            return False
+        if stat.st_size <= threshold:
+            await blocking.run(bucket.blob(blob_name).upload_from_filename, file_path)
+        else:
+            await _composite_upload(
+                bucket, blob_name, file_path, stat, progress, concurrency
+            )
+    except Exception:
+        progress["state"] = "failed"
+        raise
+    progress["uploaded_bytes"] = stat.st_size
+    progress["state"] = "done"
+    return True
+
+
+async def _composite_upload(bucket, blob_name, file_path, stat, progress, concurrency):
+    part_size = _part_size(stat.st_size)
+    parts_prefix = f"{blob_name}.parts/{stat.st_size}-{stat.st_mtime_ns}"
+    offsets = range(0, stat.st_size, part_size)
+
+    def _upload_part(index, offset):
+        with open(file_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(part_size)
+        part = bucket.get_blob(f"{parts_prefix}/{index:04d}")
+        if part is None or part.crc32c != _crc32c(data):
+            part = bucket.blob(f"{parts_prefix}/{index:04d}")
+            part.upload_from_string(data, checksum="crc32c")
+        return index, len(data), part
+
+    async def _upload(index, offset):
+        return await blocking.run(_upload_part, index, offset)
+
+    parts = [None] * len(offsets)
+    async for index, uploaded, part in tasks.bounded_as_completed(
+        [_upload(index, offset) for index, offset in enumerate(offsets)],
+        concurrency,
+    ):
+        parts[index] = part
+        progress["uploaded_bytes"] += uploaded
+
+    destination = bucket.blob(blob_name)
+    await blocking.run(destination.compose, parts)
+    # The parts are only needed to resume a failed upload.
+    await blocking.run(bucket.delete_blobs, parts, on_error=lambda blob: None)
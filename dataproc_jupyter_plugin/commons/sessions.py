@@ -0,0 +1,67 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import aiohttp
+
+# Key under which the shared session manager is stored in the Tornado
+# application settings.
+SETTINGS_KEY = "dataproc_plugin_client_sessions"
+
+
+class ClientSessionManager:
+    """Owns the aiohttp session shared by all of the service clients.
+
+    The session (and its connection pool) lives for as long as the Jupyter
+    server, so that requests to the Google APIs reuse open TCP/TLS connections
+    instead of paying for a new handshake on every call.
+
+    The session is created lazily, because aiohttp sessions must be created
+    from within a running event loop.
+    """
+
+    def __init__(self, log, limit, limit_per_host, keepalive_timeout, dns_cache_ttl):
+        self.log = log
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._connector = None
+        self._session = None
+
+    def get(self):
+        if self._session is None:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=self._connector)
+            self.log.info("Created shared HTTP client session")
+        return self._session
+
+    async def close(self):
+        session, connector = self._session, self._connector
+        self._session = None
+        self._connector = None
+        if session is not None:
+            await session.close()
+        if connector is not None and not connector.closed:
+            await connector.close()
+
+
+def client_session(handler):
+    """Returns the shared aiohttp session for the given request handler."""
+    return handler.settings[SETTINGS_KEY].get()
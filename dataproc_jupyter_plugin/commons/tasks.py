@@ -0,0 +1,40 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+
+async def bounded_as_completed(coros, limit):
+    """Runs `coros` with at most `limit` in flight, yielding results as they finish.
+
+    Results are yielded in completion order. Any coroutines that are still
+    pending when the caller stops iterating are cancelled.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(coro):
+        try:
+            async with semaphore:
+                return await coro
+        finally:
+            # Closes coroutines that were cancelled before they got to start.
+            coro.close()
+
+    tasks = [asyncio.ensure_future(_run(coro)) for coro in coros]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,54 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATES_FOLDER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dagTemplates"
+)
+DAG_TEMPLATE_CLUSTER_V1 = "pysparkJobTemplate-v1.txt"
+DAG_TEMPLATE_SERVERLESS_V1 = "pysparkBatchTemplate-v1.txt"
+DAG_TEMPLATES = [DAG_TEMPLATE_CLUSTER_V1, DAG_TEMPLATE_SERVERLESS_V1]
+
+
+def _new_environment(templates_folder_path):
+    # Compiled templates are kept in memory by the environment. With
+    # `auto_reload` a cached template is only recompiled once its file's mtime
+    # changes, and the bytecode cache lets a restarted server skip the Jinja
+    # compilation step.
+    return Environment(
+        loader=FileSystemLoader(templates_folder_path),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=True,
+    )
+
+
+_environment = _new_environment(TEMPLATES_FOLDER_PATH)
+
+
+def load():
+    """Compiles the DAG templates ahead of the first scheduled job."""
+    for name in DAG_TEMPLATES:
+        _environment.get_template(name)
+
+
+def get_template(name):
+    return _environment.get_template(name)
+
+
+def template_path(name):
+    """Returns the path of a file shipped alongside the DAG templates."""
+    return os.path.join(TEMPLATES_FOLDER_PATH, name)
@@ -15,13 +15,13 @@
 import json
 import re
 
-import aiohttp
 import tornado
 from jupyter_server.base.handlers import APIHandler
 
 from dataproc_jupyter_plugin import credentials
 from dataproc_jupyter_plugin.commons import constants
-from dataproc_jupyter_plugin.services import airflow
+from dataproc_jupyter_plugin.commons import sessions
+from dataproc_jupyter_plugin.services import airflow, composer
 
 
 class AirflowHandler(APIHandler):
@@ -56,6 +56,20 @@ class AirflowHandler(APIHandler):
             raise ValueError(f"Invalid bucket name: {bucket_arg}")
         return bucket_arg
 
+    def int_argument(self, name, default, minimum):
+        """Returns an integer query argument, rejecting bad values with a 400."""
+        value = self.get_argument(name, default=None)
+        if value is None:
+            return default
+        try:
+            parsed = int(value)
+        except ValueError:
+            parsed = None
+        if parsed is None or parsed < minimum:
+            self.set_status(400)
+            raise ValueError(f"Invalid {name}: {value}")
+        return parsed
+
     def description(self):
         pass
 
@@ -65,12 +79,12 @@ class AirflowHandler(APIHandler):
     @tornado.web.authenticated
     async def get(self):
         try:
-            async with aiohttp.ClientSession() as client_session:
-                client = airflow.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                resp = await self._handle_get(client)
-                self.finish(json.dumps(resp))
+            client_session = sessions.client_session(self)
+            client = airflow.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            resp = await self._handle_get(client)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error fetching {self.description()}")
             self.finish({"error": str(e)})
@@ -81,12 +95,12 @@ class AirflowHandler(APIHandler):
     @tornado.web.authenticated
     async def post(self):
         try:
-            async with aiohttp.ClientSession() as client_session:
-                client = airflow.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                resp = await self._handle_post(client)
-                self.finish(json.dumps(resp))
+            client_session = sessions.client_session(self)
+            client = airflow.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            resp = await self._handle_post(client)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error updating {self.description()}")
             self.finish({"error": str(e)})
@@ -97,12 +111,12 @@ class AirflowHandler(APIHandler):
     @tornado.web.authenticated
     async def delete(self):
         try:
-            async with aiohttp.ClientSession() as client_session:
-                client = airflow.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                resp = await self._handle_delete(client)
-                self.finish(json.dumps(resp))
+            client_session = sessions.client_session(self)
+            client = airflow.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            resp = await self._handle_delete(client)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error deleting {self.description()}")
             self.finish({"error": str(e)})
@@ -113,7 +127,32 @@ class DagListController(AirflowHandler):
         return "cluster list"
 
     async def _handle_get(self, client):
-        return await client.list_jobs(self.composer_environment)
+        name = self.get_argument("name", default=None)
+        status = self.get_argument("status", default=None)
+        if status not in (None, "active", "paused"):
+            raise ValueError(f"Invalid DAG status: {status}")
+        paused = None if status is None else status == "paused"
+        return await client.list_jobs(
+            self.composer_environment, dag_id_pattern=name, paused=paused
+        )
+
+
+class JobInventoryController(AirflowHandler):
+    def description(self):
+        return "job inventory"
+
+    async def _handle_get(self, client):
+        composer_client = composer.Client(
+            await credentials.get_cached(), self.log, client.client_session
+        )
+        environments = await composer_client.list_environments()
+        if isinstance(environments, dict):
+            raise Exception(
+                f"Error listing composer environments: {list(environments.values())[0]}"
+            )
+        return await client.list_jobs_in_environments(
+            [environment.name for environment in environments]
+        )
 
 
 class DagDeleteController(AirflowHandler):
@@ -148,6 +187,22 @@ class DagUpdateController(AirflowHandler):
         return {"status": update_response}
 
 
+class DagBulkActionController(AirflowHandler):
+    def description(self):
+        return "DAGs"
+
+    async def _handle_post(self, client):
+        input_data = self.get_json_body()
+        action = input_data["action"]
+        dag_ids = input_data["dag_ids"]
+        if action not in airflow.BULK_ACTIONS:
+            raise ValueError(f"Invalid bulk action: {action}")
+        for dag_id in dag_ids:
+            if not re.fullmatch(constants.DAG_ID_REGEXP, dag_id):
+                raise ValueError(f"Invalid DAG ID: {dag_id}")
+        return await client.bulk_update_jobs(self.composer_environment, dag_ids, action)
+
+
 class DagRunController(AirflowHandler):
     def description(self):
         return "dag run list"
@@ -161,6 +216,18 @@ class DagRunController(AirflowHandler):
         )
 
 
+class DagRunHistoryController(AirflowHandler):
+    def description(self):
+        return "dag run history"
+
+    async def _handle_get(self, client):
+        start_date = self.get_argument("start_date")
+        end_date = self.get_argument("end_date")
+        return await client.dag_run_history(
+            self.composer_environment, self.dag_id, start_date, end_date
+        )
+
+
 class DagRunTaskController(AirflowHandler):
     def description(self):
         return "dag run tasks"
@@ -187,6 +254,84 @@ class DagRunTaskLogsController(AirflowHandler):
         )
 
 
+class DagRunTaskLogsStreamController(AirflowHandler):
+    def description(self):
+        return "dag run task log stream"
+
+    def _write_event(self, data, event=None, event_id=None):
+        if event:
+            self.write(f"event: {event}\n")
+        if event_id:
+            self.write(f"id: {event_id}\n")
+        self.write(f"data: {json.dumps(data)}\n\n")
+
+    @tornado.web.authenticated
+    async def get(self):
+        """Streams a task log as Server-Sent Events.
+
+        Each event holds the new log lines, and its ID is the continuation
+        token to resume from. A reconnecting `EventSource` sends it back as
+        `Last-Event-ID`, so only the lines it missed are sent again. With
+        `follow=true` the stream stays open until the task has finished, and
+        it always ends with an `end` event.
+        """
+        try:
+            task_id = self.get_argument("task_id")
+            task_try_number = self.get_argument("task_try_number")
+            follow = self.get_argument("follow", default="false").lower() == "true"
+            token = self.request.headers.get("Last-Event-ID") or self.get_argument(
+                "token", default=None
+            )
+            client_session = sessions.client_session(self)
+            client = airflow.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            chunks = client.stream_dag_run_task_logs(
+                self.composer_environment,
+                self.dag_id,
+                self.dag_run_id,
+                task_id,
+                task_try_number,
+                token=token,
+                follow=follow,
+            )
+        except Exception as e:
+            self.log.exception(f"Error fetching {self.description()}")
+            self.finish({"error": str(e)})
+            return
+
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+        try:
+            async for chunk in chunks:
+                if "error" in chunk:
+                    self._write_event(chunk, event="error")
+                else:
+                    self._write_event(
+                        chunk["content"], event_id=chunk["continuation_token"]
+                    )
+                await self.flush()
+            self._write_event({}, event="end")
+            self.finish()
+        except tornado.iostream.StreamClosedError:
+            self.log.info("Client closed the dag run task log stream")
+        finally:
+            await chunks.aclose()
+
+
+class DagRunDetailsController(AirflowHandler):
+    def description(self):
+        return "dag run details"
+
+    async def _handle_get(self, client):
+        tail_size = self.int_argument(
+            "tail_size", default=airflow.TASK_LOG_TAIL_SIZE, minimum=1
+        )
+        return await client.dag_run_details(
+            self.composer_environment, self.dag_id, self.dag_run_id, tail_size
+        )
+
+
 class EditDagController(AirflowHandler):
     def description(self):
         return "job"
@@ -200,7 +345,16 @@ class ImportErrorController(AirflowHandler):
         return "import error list"
 
     async def _handle_get(self, client):
-        return await client.list_import_errors(self.composer_environment)
+        limit = self.int_argument("limit", default=None, minimum=0)
+        offset = self.int_argument("offset", default=0, minimum=0)
+        # Tornado sets an ETag from the response body, so a poll that sends it
+        # back in If-None-Match gets 304 Not Modified while nothing changed.
+        return await client.list_import_errors(
+            self.composer_environment,
+            limit=limit,
+            offset=offset,
+            since=self.get_argument("since", default=None),
+        )
 
 
 class TriggerDagController(AirflowHandler):
@@ -15,11 +15,11 @@
 
 import json
 
-import aiohttp
 import tornado
 from jupyter_server.base.handlers import APIHandler
 
 from dataproc_jupyter_plugin import credentials
+from dataproc_jupyter_plugin.commons import sessions
 from dataproc_jupyter_plugin.services import bigquery
 
 # GCP project holding BigQuery public datasets.
@@ -32,11 +32,11 @@ class DatasetController(APIHandler):
         try:
             page_token = self.get_argument("pageToken")
             project_id = self.get_argument("project_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = bigquery.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                dataset_list = await client.list_datasets(page_token, project_id)
+            client_session = sessions.client_session(self)
+            client = bigquery.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            dataset_list = await client.list_datasets(page_token, project_id)
             self.finish(json.dumps(dataset_list))
         except Exception as e:
             self.log.exception("Error fetching datasets")
@@ -50,11 +50,11 @@ class TableController(APIHandler):
             page_token = self.get_argument("pageToken")
             dataset_id = self.get_argument("dataset_id")
             project_id = self.get_argument("project_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = bigquery.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                table_list = await client.list_table(dataset_id, page_token, project_id)
+            client_session = sessions.client_session(self)
+            client = bigquery.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            table_list = await client.list_table(dataset_id, page_token, project_id)
             self.finish(json.dumps(table_list))
         except Exception as e:
             self.log.exception("Error fetching datasets")
@@ -67,11 +67,11 @@ class DatasetInfoController(APIHandler):
         try:
             dataset_id = self.get_argument("dataset_id")
             project_id = self.get_argument("project_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = bigquery.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                dataset_info = await client.list_dataset_info(dataset_id, project_id)
+            client_session = sessions.client_session(self)
+            client = bigquery.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            dataset_info = await client.list_dataset_info(dataset_id, project_id)
             self.finish(json.dumps(dataset_info))
         except Exception as e:
             self.log.exception("Error fetching dataset information")
@@ -85,13 +85,11 @@ class TableInfoController(APIHandler):
             dataset_id = self.get_argument("dataset_id")
             table_id = self.get_argument("table_id")
             project_id = self.get_argument("project_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = bigquery.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                table_info = await client.list_table_info(
-                    dataset_id, table_id, project_id
-                )
+            client_session = sessions.client_session(self)
+            client = bigquery.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            table_info = await client.list_table_info(dataset_id, table_id, project_id)
             self.finish(json.dumps(table_info))
         except Exception as e:
             self.log.exception("Error fetching table information")
@@ -107,13 +105,13 @@ class PreviewController(APIHandler):
             max_results = self.get_argument("max_results")
             start_index = self.get_argument("start_index")
             project_id = self.get_argument("project_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = bigquery.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                preview_data = await client.bigquery_preview_data(
-                    dataset_id, table_id, max_results, start_index, project_id
-                )
+            client_session = sessions.client_session(self)
+            client = bigquery.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            preview_data = await client.bigquery_preview_data(
+                dataset_id, table_id, max_results, start_index, project_id
+            )
             self.finish(json.dumps(preview_data))
         except Exception as e:
             self.log.exception("Error fetching preview data")
@@ -147,13 +145,13 @@ class SearchController(APIHandler):
             type = self.get_argument("type")
             system = self.get_argument("system")
             projects = await bq_projects_list()
-            async with aiohttp.ClientSession() as client_session:
-                client = bigquery.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                search_data = await client.bigquery_search(
-                    search_string, type, system, projects
-                )
+            client_session = sessions.client_session(self)
+            client = bigquery.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            search_data = await client.bigquery_search(
+                search_string, type, system, projects
+            )
             self.finish(json.dumps(search_data))
         except Exception as e:
             self.log.exception("Error fetching search data")
@@ -14,11 +14,11 @@
 
 import json
 
-import aiohttp
 import tornado
 from jupyter_server.base.handlers import APIHandler
 
 from dataproc_jupyter_plugin import credentials
+from dataproc_jupyter_plugin.commons import sessions
 from dataproc_jupyter_plugin.services import composer
 
 
@@ -27,13 +27,13 @@ class EnvironmentListController(APIHandler):
     async def get(self):
         """Returns names of available composer environments"""
         try:
-            async with aiohttp.ClientSession() as client_session:
-                client = composer.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                environments = await client.list_environments()
-                self.set_header("Content-Type", "application/json")
-                self.finish(json.dumps(environments, default=lambda x: x.dict()))
+            client_session = sessions.client_session(self)
+            client = composer.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            environments = await client.list_environments()
+            self.set_header("Content-Type", "application/json")
+            self.finish(json.dumps(environments, default=lambda x: x.dict()))
         except Exception as e:
             self.log.exception(f"Error fetching composer environments: {str(e)}")
             self.finish({"error": str(e)})
@@ -14,11 +14,11 @@
 
 import json
 
-import aiohttp
 import tornado
 from jupyter_server.base.handlers import APIHandler
 
 from dataproc_jupyter_plugin import credentials
+from dataproc_jupyter_plugin.commons import sessions
 from dataproc_jupyter_plugin.services import compute
 
 
@@ -92,12 +92,12 @@ class GetXpnHostController(APIHandler):
     @tornado.web.authenticated
     async def get(self):
         try:
-            async with aiohttp.ClientSession() as client_session:
-                client = compute.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                xpn_host = await client.get_xpn_host()
-                self.finish(json.dumps(xpn_host))
+            client_session = sessions.client_session(self)
+            client = compute.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            xpn_host = await client.get_xpn_host()
+            self.finish(json.dumps(xpn_host))
         except Exception as e:
             self.log.exception(f"Error fetching xpn host: {str(e)}")
             self.finish({"error": str(e)})
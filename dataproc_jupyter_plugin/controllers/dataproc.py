@@ -14,11 +14,11 @@
 
 import json
 
-import aiohttp
 import tornado
 from jupyter_server.base.handlers import APIHandler
 
 from dataproc_jupyter_plugin import credentials
+from dataproc_jupyter_plugin.commons import sessions
 from dataproc_jupyter_plugin.services import dataproc
 
 
@@ -28,11 +28,11 @@ class ClusterListController(APIHandler):
         try:
             page_token = self.get_argument("pageToken")
             page_size = self.get_argument("pageSize")
-            async with aiohttp.ClientSession() as client_session:
-                client = dataproc.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                cluster_list = await client.list_clusters(page_size, page_token)
+            client_session = sessions.client_session(self)
+            client = dataproc.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            cluster_list = await client.list_clusters(page_size, page_token)
             self.finish(json.dumps(cluster_list))
         except Exception as e:
             self.log.exception("Error fetching cluster list")
@@ -45,11 +45,11 @@ class RuntimeController(APIHandler):
         try:
             page_token = self.get_argument("pageToken")
             page_size = self.get_argument("pageSize")
-            async with aiohttp.ClientSession() as client_session:
-                client = dataproc.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                runtime_list = await client.list_runtime(page_size, page_token)
+            client_session = sessions.client_session(self)
+            client = dataproc.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            runtime_list = await client.list_runtime(page_size, page_token)
             self.finish(json.dumps(runtime_list))
         except Exception as e:
             self.log.exception(f"Error fetching runtime template list: {str(e)}")
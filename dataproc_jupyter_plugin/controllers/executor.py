@@ -14,41 +14,88 @@
 
 import json
 import re
+import tempfile
 
-import aiohttp
 import tornado
 from jupyter_server.base.handlers import APIHandler
 
 from dataproc_jupyter_plugin import credentials
 from dataproc_jupyter_plugin.commons import constants
+from dataproc_jupyter_plugin.commons import downloads
+from dataproc_jupyter_plugin.commons import sessions
 from dataproc_jupyter_plugin.services import executor
 
 
+def _validate_job(input_data):
+    if not re.fullmatch(
+        constants.COMPOSER_ENVIRONMENT_REGEXP,
+        input_data["composer_environment_name"],
+    ):
+        raise ValueError(f"Invalid environment name: {input_data}")
+    if not re.fullmatch(constants.DAG_ID_REGEXP, input_data["dag_id"]):
+        raise ValueError(f"Invalid DAG ID: {input_data}")
+    if not re.fullmatch(constants.AIRFLOW_JOB_REGEXP, input_data["name"]):
+        raise ValueError(f"Invalid job name: {input_data}")
+
+
 class ExecutorController(APIHandler):
     @tornado.web.authenticated
     async def post(self):
         try:
             input_data = self.get_json_body()
-            if not re.fullmatch(
-                constants.COMPOSER_ENVIRONMENT_REGEXP,
-                input_data["composer_environment_name"],
-            ):
-                raise ValueError(f"Invalid environment name: {input_data}")
-            if not re.fullmatch(constants.DAG_ID_REGEXP, input_data["dag_id"]):
-                raise ValueError(f"Invalid DAG ID: {input_data}")
-            if not re.fullmatch(constants.AIRFLOW_JOB_REGEXP, input_data["name"]):
-                raise ValueError(f"Invalid job name: {input_data}")
-            async with aiohttp.ClientSession() as client_session:
-                client = executor.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                result = await client.execute(input_data)
-                self.finish(json.dumps(result))
+            _validate_job(input_data)
+            client_session = sessions.client_session(self)
+            client = executor.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            plugin_config = self.settings[constants.PLUGIN_CONFIG_SETTINGS_KEY]
+            result = await client.execute(
+                input_data, save_local_copy=plugin_config.save_local_dag_files
+            )
+            self.finish(json.dumps(result))
         except Exception as e:
             self.log.exception(f"Error creating dag schedule: {str(e)}")
             self.finish({"error": str(e)})
 
 
+class BatchExecutorController(APIHandler):
+    @tornado.web.authenticated
+    async def post(self):
+        """Creates a DAG schedule for each job in the request body.
+
+        Returns a list with one result per job, in request order.
+        """
+        try:
+            jobs_data = self.get_json_body()["jobs"]
+            results = [None] * len(jobs_data)
+            valid_jobs = []
+            for index, input_data in enumerate(jobs_data):
+                try:
+                    _validate_job(input_data)
+                    valid_jobs.append((index, input_data))
+                except Exception as e:
+                    results[index] = {"error": str(e)}
+            client_session = sessions.client_session(self)
+            client = executor.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            plugin_config = self.settings[constants.PLUGIN_CONFIG_SETTINGS_KEY]
+            batch_results = await client.execute_batch(
+                [input_data for _, input_data in valid_jobs],
+                save_local_copy=plugin_config.save_local_dag_files,
+            )
+            for (index, _), result in zip(valid_jobs, batch_results):
+                results[index] = result
+            for input_data, result in zip(jobs_data, results):
+                if isinstance(input_data, dict):
+                    result["name"] = input_data.get("name")
+                    result["dag_id"] = input_data.get("dag_id")
+            self.finish(json.dumps(results))
+        except Exception as e:
+            self.log.exception(f"Error creating dag schedules: {str(e)}")
+            self.finish({"error": str(e)})
+
+
 class DownloadOutputController(APIHandler):
     @tornado.web.authenticated
     async def post(self):
@@ -65,14 +112,76 @@ class DownloadOutputController(APIHandler):
                 raise ValueError(f"Invalid DAG ID: {dag_id}")
             if not re.fullmatch(constants.DAG_RUN_ID_REGEXP, dag_run_id):
                 raise ValueError(f"Invalid DAG Run ID: {dag_run_id}")
-            async with aiohttp.ClientSession() as client_session:
-                client = executor.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                download_status = await client.download_dag_output(
-                    composer_name, bucket_name, dag_id, dag_run_id
-                )
-                self.finish(json.dumps({"status": download_status}))
+            client_session = sessions.client_session(self)
+            client = executor.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            download_status = await client.download_dag_output(
+                composer_name, bucket_name, dag_id, dag_run_id
+            )
+            self.finish(json.dumps({"status": download_status}))
         except Exception as e:
             self.log.exception("Error download output file")
             self.finish({"error": str(e)})
+
+
+class BulkDownloadOutputController(APIHandler):
+    @tornado.web.authenticated
+    async def post(self):
+        """Downloads the output notebooks of many DAG runs at once.
+
+        Progress is streamed back as one JSON line per notebook. When `zip` is
+        set the notebooks are instead streamed back as a zip archive.
+        """
+        try:
+            input_data = self.get_json_body()
+            composer_name = input_data["composer"]
+            bucket_name = input_data["bucket_name"]
+            # Repeated runs would be downloaded into the same file at once.
+            dag_runs = list(
+                dict.fromkeys(
+                    (run["dag_id"], run["dag_run_id"]) for run in input_data["runs"]
+                )
+            )
+            if not re.fullmatch(constants.COMPOSER_ENVIRONMENT_REGEXP, composer_name):
+                raise ValueError(f"Invalid Composer environment name: {composer_name}")
+            if not re.fullmatch(constants.BUCKET_NAME_REGEXP, bucket_name):
+                raise ValueError(f"Invalid bucket name: {bucket_name}")
+            for dag_id, dag_run_id in dag_runs:
+                if not re.fullmatch(constants.DAG_ID_REGEXP, dag_id):
+                    raise ValueError(f"Invalid DAG ID: {dag_id}")
+                if not re.fullmatch(constants.DAG_RUN_ID_REGEXP, dag_run_id):
+                    raise ValueError(f"Invalid DAG Run ID: {dag_run_id}")
+            plugin_config = self.settings[constants.PLUGIN_CONFIG_SETTINGS_KEY]
+            concurrency = downloads.download_concurrency(
+                input_data.get(
+                    "concurrency", plugin_config.output_download_concurrency
+                ),
+                plugin_config.output_download_concurrency,
+            )
+            client_session = sessions.client_session(self)
+            client = executor.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+        except Exception as e:
+            self.log.exception("Error downloading output files")
+            self.finish({"error": str(e)})
+            return
+
+        if not input_data.get("zip"):
+            results = client.download_dag_outputs(
+                composer_name, bucket_name, dag_runs, concurrency=concurrency
+            )
+            await downloads.stream_progress(self, results, len(dag_runs))
+            return
+        with tempfile.TemporaryDirectory() as destination_dir:
+            results = client.download_dag_outputs(
+                composer_name,
+                bucket_name,
+                dag_runs,
+                destination_dir=destination_dir,
+                concurrency=concurrency,
+            )
+            await downloads.stream_zip(
+                self, results, destination_dir, f"{composer_name}-outputs.zip"
+            )
@@ -13,11 +13,16 @@
 # limitations under the License.
 
 import json
+import re
+import tempfile
 
 import tornado
 from jupyter_server.base.handlers import APIHandler
 
 from dataproc_jupyter_plugin import credentials
+from dataproc_jupyter_plugin.commons import constants
+from dataproc_jupyter_plugin.commons import downloads
+from dataproc_jupyter_plugin.commons import gcs
 from dataproc_jupyter_plugin.services import storage
 
 
@@ -49,3 +54,68 @@ class DownloadOutputController(APIHandler):
         except Exception as e:
             self.log.exception({"Error in downloading output file": str(e)})
             self.finish({"Error in downloading output file": str(e)})
+
+
+class BulkDownloadOutputController(APIHandler):
+    @tornado.web.authenticated
+    async def post(self):
+        """Downloads the output notebooks of many Vertex job runs at once.
+
+        Progress is streamed back as one JSON line per notebook. When `zip` is
+        set the notebooks are instead streamed back as a zip archive.
+        """
+        try:
+            input_data = self.get_json_body()
+            bucket_name = input_data["bucket_name"]
+            # Repeated outputs would be downloaded into the same file at once.
+            outputs = list(
+                dict.fromkeys(
+                    (output["job_run_id"], output["file_name"])
+                    for output in input_data["outputs"]
+                )
+            )
+            if not re.fullmatch(constants.BUCKET_NAME_REGEXP, bucket_name):
+                raise ValueError(f"Invalid bucket name: {bucket_name}")
+            for job_run_id, _ in outputs:
+                if not re.fullmatch(constants.VERTEX_JOB_RUN_ID_REGEXP, job_run_id):
+                    raise ValueError(f"Invalid job run ID: {job_run_id}")
+            plugin_config = self.settings[constants.PLUGIN_CONFIG_SETTINGS_KEY]
+            concurrency = downloads.download_concurrency(
+                input_data.get(
+                    "concurrency", plugin_config.output_download_concurrency
+                ),
+                plugin_config.output_download_concurrency,
+            )
+            client = storage.Client(await credentials.get_cached(), self.log)
+        except Exception as e:
+            self.log.exception({"Error in downloading output files": str(e)})
+            self.finish({"error": str(e)})
+            return
+
+        if not input_data.get("zip"):
+            results = client.download_outputs(
+                bucket_name, outputs, concurrency=concurrency
+            )
+            await downloads.stream_progress(self, results, len(outputs))
+            return
+        with tempfile.TemporaryDirectory() as destination_dir:
+            results = client.download_outputs(
+                bucket_name,
+                outputs,
+                destination_dir=destination_dir,
+                concurrency=concurrency,
+            )
+            await downloads.stream_zip(
+                self, results, destination_dir, f"{bucket_name}-outputs.zip"
+            )
+
+
+class UploadProgressController(APIHandler):
+    @tornado.web.authenticated
+    async def get(self):
+        """Returns the progress of running and recently finished uploads"""
+        uri = self.get_argument("uri", None)
+        progress = gcs.upload_progress()
+        if uri is not None:
+            progress = {uri: progress[uri]} if uri in progress else {}
+        self.finish(json.dumps(progress))
@@ -14,11 +14,11 @@
 
 import json
 
-import aiohttp
 import tornado
 from jupyter_server.base.handlers import APIHandler
 
 from dataproc_jupyter_plugin import credentials
+from dataproc_jupyter_plugin.commons import sessions
 from dataproc_jupyter_plugin.services import vertex
 
 
@@ -28,13 +28,13 @@ class UIConfigController(APIHandler):
         """Returns available ui config"""
         try:
             region_id = self.get_argument("region_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
 
-                configs = await client.list_uiconfig(region_id)
-                self.finish(json.dumps(configs))
+            configs = await client.list_uiconfig(region_id)
+            self.finish(json.dumps(configs))
         except Exception as e:
             self.log.exception(f"Error fetching ui config: {str(e)}")
             self.finish({"error": str(e)})
@@ -45,12 +45,12 @@ class CreateVertexScheduleController(APIHandler):
     async def post(self):
         try:
             input_data = self.get_json_body()
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                result = await client.create_job_schedule(input_data)
-                self.finish(json.dumps(result))
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            result = await client.create_job_schedule(input_data)
+            self.finish(json.dumps(result))
         except Exception as e:
             self.log.exception(f"Error creating job schedule: {str(e)}")
             self.finish({"error": str(e)})
@@ -61,12 +61,12 @@ class CreateBucketController(APIHandler):
     async def post(self):
         try:
             input_data = self.get_json_body()
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                result = await client.create_new_bucket(input_data)
-                self.finish(json.dumps(result))
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            result = await client.create_new_bucket(input_data)
+            self.finish(json.dumps(result))
         except Exception as e:
             self.log.exception(f"Error creating a new bucket: {str(e)}")
             self.finish({"error": str(e)})
@@ -79,18 +79,45 @@ class ListSchedulesController(APIHandler):
         try:
             region_id = self.get_argument("region_id")
             next_page_token = self.get_argument("next_page_token", default=None)
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
 
-                schedules = await client.list_schedules(region_id, next_page_token)
-                self.finish(json.dumps(schedules))
+            schedules = await client.list_schedules(region_id, next_page_token)
+            self.finish(json.dumps(schedules))
         except Exception as e:
             self.log.exception(f"Error fetching list of schedules: {str(e)}")
             self.finish({"error": str(e)})
 
 
+class ListAllSchedulesController(APIHandler):
+    @tornado.web.authenticated
+    async def get(self):
+        """Streams every page of schedules as newline-delimited JSON"""
+        try:
+            region_id = self.get_argument("region_id")
+            include_latest_job = (
+                self.get_argument("include_latest_job", default="false").lower()
+                == "true"
+            )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+
+            self.set_header("Content-Type", "application/x-ndjson")
+            async for schedules in client.list_all_schedules(
+                region_id, include_latest_job
+            ):
+                self.write(json.dumps({"schedules": schedules}) + "\n")
+                await self.flush()
+            self.finish()
+        except Exception as e:
+            self.log.exception(f"Error fetching list of all schedules: {str(e)}")
+            self.finish(json.dumps({"error": str(e)}) + "\n")
+
+
 class PauseScheduleController(APIHandler):
     @tornado.web.authenticated
     async def get(self):
@@ -98,13 +125,13 @@ class PauseScheduleController(APIHandler):
         try:
             region_id = self.get_argument("region_id")
             schedule_id = self.get_argument("schedule_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
 
-                resp = await client.pause_schedule(region_id, schedule_id)
-                self.finish(json.dumps(resp))
+            resp = await client.pause_schedule(region_id, schedule_id)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error pausing the schedule: {str(e)}")
             self.finish({"error": str(e)})
@@ -117,13 +144,13 @@ class ResumeScheduleController(APIHandler):
         try:
             region_id = self.get_argument("region_id")
             schedule_id = self.get_argument("schedule_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
 
-                resp = await client.resume_schedule(region_id, schedule_id)
-                self.finish(json.dumps(resp))
+            resp = await client.resume_schedule(region_id, schedule_id)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error resuming the schedule: {str(e)}")
             self.finish({"error": str(e)})
@@ -136,13 +163,13 @@ class DeleteScheduleController(APIHandler):
         try:
             region_id = self.get_argument("region_id")
             schedule_id = self.get_argument("schedule_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
 
-                resp = await client.delete_schedule(region_id, schedule_id)
-                self.finish(json.dumps(resp))
+            resp = await client.delete_schedule(region_id, schedule_id)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error deleting the schedule: {str(e)}")
             self.finish({"error": str(e)})
@@ -155,18 +182,40 @@ class TriggerScheduleController(APIHandler):
         try:
             region_id = self.get_argument("region_id")
             schedule_id = self.get_argument("schedule_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
 
-                resp = await client.trigger_schedule(region_id, schedule_id)
-                self.finish(json.dumps(resp))
+            resp = await client.trigger_schedule(region_id, schedule_id)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error triggering the schedule: {str(e)}")
             self.finish({"error": str(e)})
 
 
+class BulkScheduleActionController(APIHandler):
+    @tornado.web.authenticated
+    async def post(self):
+        """Pauses, resumes, deletes or triggers several schedules"""
+        try:
+            input_data = self.get_json_body()
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+
+            resp = await client.bulk_update_schedules(
+                input_data["region_id"],
+                input_data["schedule_ids"],
+                input_data["action"],
+            )
+            self.finish(json.dumps(resp))
+        except Exception as e:
+            self.log.exception(f"Error updating the schedules: {str(e)}")
+            self.finish({"error": str(e)})
+
+
 class UpdateScheduleController(APIHandler):
     @tornado.web.authenticated
     async def post(self):
@@ -175,13 +224,13 @@ class UpdateScheduleController(APIHandler):
             region_id = self.get_argument("region_id")
             schedule_id = self.get_argument("schedule_id")
             input_data = self.get_json_body()
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
 
-                resp = await client.update_schedule(region_id, schedule_id, input_data)
-                self.finish(json.dumps(resp))
+            resp = await client.update_schedule(region_id, schedule_id, input_data)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error updating the schedule: {str(e)}")
             self.finish({"error": str(e)})
@@ -194,13 +243,13 @@ class GetScheduleController(APIHandler):
         try:
             region_id = self.get_argument("region_id")
             schedule_id = self.get_argument("schedule_id")
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
 
-                resp = await client.get_schedule(region_id, schedule_id)
-                self.finish(json.dumps(resp))
+            resp = await client.get_schedule(region_id, schedule_id)
+            self.finish(json.dumps(resp))
         except Exception as e:
             self.log.exception(f"Error getting the schedule: {str(e)}")
             self.finish({"error": str(e)})
@@ -214,14 +263,17 @@ class ListNotebookExecutionJobsController(APIHandler):
             region_id = self.get_argument("region_id")
             schedule_id = self.get_argument("schedule_id")
             start_date = self.get_argument("start_date")
-            async with aiohttp.ClientSession() as client_session:
-                client = vertex.Client(
-                    await credentials.get_cached(), self.log, client_session
-                )
-                jobs = await client.list_notebook_execution_jobs(
-                    region_id, schedule_id, start_date
-                )
-                self.finish(json.dumps(jobs))
+            end_date = self.get_argument("end_date", default=None)
+            page_size = self.get_argument("page_size", default=None)
+            page_token = self.get_argument("page_token", default=None)
+            client_session = sessions.client_session(self)
+            client = vertex.Client(
+                await credentials.get_cached(), self.log, client_session
+            )
+            jobs = await client.list_notebook_execution_jobs(
+                region_id, schedule_id, start_date, end_date, page_size, page_token
+            )
+            self.finish(json.dumps(jobs))
         except Exception as e:
             self.log.exception(f"Error fetching notebook execution jobs: {str(e)}")
             self.finish({"error": str(e)})
@@ -12,11 +12,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import datetime
+
 from google.cloud.jupyter_config.config import (
     async_get_gcloud_config,
     async_run_gcloud_subcommand,
 )
 
+# How long before the access token expires that we start refreshing the
+# cached credentials in the background.
+_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+
+# How long cached credentials are used for if gcloud does not report when the
+# access token expires.
+_DEFAULT_TTL = datetime.timedelta(minutes=10)
+
+_cached_credentials = None
+_cached_expiry = None
+_refresh_task = None
+# Bumped on every invalidation so that a refresh which was already in flight
+# does not repopulate the cache with stale credentials.
+_generation = 0
+
+# Project numbers never change, so they are kept for the process lifetime.
+_project_numbers = {}
+
 
 async def _gcp_credentials():
     """Helper method to get the project configured through gcloud"""
@@ -28,14 +49,29 @@ async def _gcp_project():
     return await async_get_gcloud_config("configuration.properties.core.project")
 
 
+async def _gcp_token_expiry():
+    """Helper method to get the expiry time of the gcloud access token"""
+    expiry = await async_get_gcloud_config("credential.token_expiry")
+    if not expiry:
+        return None
+    try:
+        return datetime.datetime.strptime(expiry, "%Y-%m-%dT%H:%M:%SZ").replace(
+            tzinfo=datetime.timezone.utc
+        )
+    except ValueError:
+        return None
+
+
 async def _gcp_project_number():
     """Helper method to get the project number for the project configured through gcloud"""
     project = await _gcp_project()
     if not project:
         return None
-    return await async_run_gcloud_subcommand(
-        f'projects describe {project} --format="value(projectNumber)"'
-    )
+    if project not in _project_numbers:
+        _project_numbers[project] = await async_run_gcloud_subcommand(
+            f'projects describe {project} --format="value(projectNumber)"'
+        )
+    return _project_numbers[project]
 
 
 async def _gcp_region():
@@ -48,7 +84,7 @@ async def _gcp_region():
     return region
 
 
-async def get_cached():
+async def _resolve():
     credentials = {
         "project_id": "",
         "project_number": 0,
@@ -76,3 +112,64 @@ async def get_cached():
         credentials["login_error"] = 1
 
     return credentials
+
+
+async def _refresh():
+    global _cached_credentials, _cached_expiry
+    generation = _generation
+    now = datetime.datetime.now(datetime.timezone.utc)
+    expiry = None
+    credentials = await _resolve()
+    if generation != _generation:
+        return credentials
+    if not credentials["config_error"] and not credentials["login_error"]:
+        try:
+            expiry = await _gcp_token_expiry()
+        except Exception:
+            pass
+        # Errors are never cached, so that fixing the gcloud configuration
+        # takes effect on the next call.
+        _cached_credentials = credentials
+        _cached_expiry = expiry or (now + _DEFAULT_TTL + _REFRESH_MARGIN)
+    return credentials
+
+
+def _start_refresh():
+    """Returns the in-flight refresh, starting one if there is none.
+
+    Concurrent callers share a single refresh rather than each running their
+    own set of gcloud commands.
+    """
+    global _refresh_task
+    loop = asyncio.get_running_loop()
+    if _refresh_task is None or _refresh_task.get_loop() is not loop:
+        _refresh_task = loop.create_task(_refresh())
+        _refresh_task.add_done_callback(_refresh_done)
+    return _refresh_task
+
+
+def _refresh_done(task):
+    global _refresh_task
+    if _refresh_task is task:
+        _refresh_task = None
+
+
+async def get_cached():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if _cached_credentials is not None and now < _cached_expiry:
+        if now >= _cached_expiry - _REFRESH_MARGIN:
+            # The token is about to expire, so refresh it in the background
+            # while the current one is still usable.
+            _start_refresh()
+        return dict(_cached_credentials)
+    credentials = await asyncio.shield(_start_refresh())
+    return dict(credentials)
+
+
+def invalidate():
+    """Drops the cached credentials so that the next call re-reads gcloud."""
+    global _cached_credentials, _cached_expiry, _refresh_task, _generation
+    _generation += 1
+    _cached_credentials = None
+    _cached_expiry = None
+    _refresh_task = None
@@ -27,10 +27,11 @@ from google.cloud.jupyter_config.config import (
 from jupyter_server.base.handlers import APIHandler
 from jupyter_server.serverapp import ServerApp
 from jupyter_server.utils import url_path_join
-from traitlets import Bool, Undefined, Unicode
+from traitlets import Bool, Float, Integer, Undefined, Unicode
 from traitlets.config import SingletonConfigurable
 
 from dataproc_jupyter_plugin import credentials, urls
+from dataproc_jupyter_plugin.commons import blocking, gcs
 from dataproc_jupyter_plugin.controllers import (
     airflow,
     bigquery,
@@ -90,6 +91,48 @@ class DataprocPluginConfig(SingletonConfigurable):
         help="Enable integration with BigQuery in JupyterLab",
     )
 
+    http_connection_limit = Integer(
+        100,
+        config=True,
+        help="Maximum number of simultaneous connections to Google APIs.",
+    )
+
+    http_connection_limit_per_host = Integer(
+        20,
+        config=True,
+        help="Maximum number of simultaneous connections to a single API host.",
+    )
+
+    http_keepalive_timeout = Float(
+        60.0,
+        config=True,
+        help="Seconds an idle connection to a Google API is kept open for reuse.",
+    )
+
+    http_dns_cache_ttl = Integer(
+        300,
+        config=True,
+        help="Seconds that resolved API host names are cached for.",
+    )
+
+    blocking_call_max_workers = Integer(
+        blocking.DEFAULT_MAX_WORKERS,
+        config=True,
+        help="Number of threads used to run blocking Google Cloud client library calls.",
+    )
+
+    save_local_dag_files = Bool(
+        False,
+        config=True,
+        help="Also write generated DAG files to ./scheduled-jobs, for debugging.",
+    )
+
+    output_download_concurrency = Integer(
+        gcs.OUTPUT_DOWNLOAD_CONCURRENCY,
+        config=True,
+        help="Maximum number of output notebooks downloaded at once by bulk downloads.",
+    )
+
 
 class SettingsHandler(APIHandler):
     @tornado.web.authenticated
@@ -135,6 +178,8 @@ class LoginHandler(APIHandler):
         output, _ = process.communicate()
         # Check if the authentication was successful
         if process.returncode == 0:
+            clear_gcloud_cache()
+            credentials.invalidate()
             self.finish({"login": "SUCCEEDED"})
         else:
             self.finish({"login": "FAILED"})
@@ -151,6 +196,8 @@ class ConfigHandler(APIHandler):
             await async_run_gcloud_subcommand(f"config set project {project_id}")
             await async_run_gcloud_subcommand(f"config set dataproc/region {region}")
             clear_gcloud_cache()
+            credentials.invalidate()
+            urls.invalidate()
             configure_gateway_client_url(self.config, self.log)
             self.finish({"config": ERROR_MESSAGE + "successful"})
         except subprocess.CalledProcessError as er:
@@ -177,6 +224,12 @@ class LogHandler(APIHandler):
         self.finish({"status": "OK"})
 
 
+class BlockingCallMetricsHandler(APIHandler):
+    @tornado.web.authenticated
+    def get(self):
+        self.finish(json.dumps(blocking.metrics()))
+
+
 def setup_handlers(web_app):
     host_pattern = ".*$"
 
@@ -193,20 +246,28 @@ def setup_handlers(web_app):
         "configuration": ConfigHandler,
         "getGcpServiceUrls": UrlHandler,
         "log": LogHandler,
+        "api/metrics/blockingCalls": BlockingCallMetricsHandler,
         "composerList": composer.EnvironmentListController,
         "dagRun": airflow.DagRunController,
+        "dagRunHistory": airflow.DagRunHistoryController,
         "dagRunTask": airflow.DagRunTaskController,
         "dagRunTaskLogs": airflow.DagRunTaskLogsController,
+        "dagRunTaskLogsStream": airflow.DagRunTaskLogsStreamController,
+        "dagRunDetails": airflow.DagRunDetailsController,
         "clusterList": dataproc.ClusterListController,
         "runtimeList": dataproc.RuntimeController,
         "createJobScheduler": executor.ExecutorController,
+        "createJobSchedulerBatch": executor.BatchExecutorController,
         "dagList": airflow.DagListController,
+        "jobInventory": airflow.JobInventoryController,
         "dagDelete": airflow.DagDeleteController,
         "dagUpdate": airflow.DagUpdateController,
+        "dagBulkAction": airflow.DagBulkActionController,
         "editJobScheduler": airflow.EditDagController,
         "importErrorsList": airflow.ImportErrorController,
         "triggerDag": airflow.TriggerDagController,
         "downloadOutput": executor.DownloadOutputController,
+        "downloadOutputs": executor.BulkDownloadOutputController,
         "bigQueryDataset": bigquery.DatasetController,
         "bigQueryTable": bigquery.TableController,
         "bigQueryDatasetInfo": bigquery.DatasetInfoController,
@@ -217,10 +278,12 @@ def setup_handlers(web_app):
         "api/logEntries/listEntries": logEntries.ListEntriesController,
         "api/vertex/listNotebookExecutionJobs": vertex.ListNotebookExecutionJobsController,
         "api/vertex/listSchedules": vertex.ListSchedulesController,
+        "api/vertex/listAllSchedules": vertex.ListAllSchedulesController,
         "api/vertex/pauseSchedule": vertex.PauseScheduleController,
         "api/vertex/resumeSchedule": vertex.ResumeScheduleController,
         "api/vertex/deleteSchedule": vertex.DeleteScheduleController,
         "api/vertex/triggerSchedule": vertex.TriggerScheduleController,
+        "api/vertex/bulkScheduleAction": vertex.BulkScheduleActionController,
         "api/vertex/updateSchedule": vertex.UpdateScheduleController,
         "api/vertex/getSchedule": vertex.GetScheduleController,
         "api/vertex/createJobScheduler": vertex.CreateVertexScheduleController,
@@ -234,6 +297,8 @@ def setup_handlers(web_app):
         "api/iam/listServiceAccount": iam.ServiceAccountController,
         "api/compute/getXpnHost": compute.GetXpnHostController,
         "api/storage/downloadOutput": storage.DownloadOutputController,
+        "api/storage/downloadOutputs": storage.BulkDownloadOutputController,
+        "api/storage/uploadProgress": storage.UploadProgressController,
     }
     handlers = [(full_path(name), handler) for name, handler in handlersMap.items()]
     web_app.add_handlers(host_pattern, handlers)
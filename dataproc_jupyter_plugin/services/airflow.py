@@ -12,12 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import datetime
+import hashlib
+import json
 import re
 import subprocess
 import urllib
+
+import cachetools
 from google.cloud import storage
 
 from dataproc_jupyter_plugin import urls
+from dataproc_jupyter_plugin.commons import blocking, tasks
 from dataproc_jupyter_plugin.commons.commands import async_run_gsutil_subcommand
 from dataproc_jupyter_plugin.commons.constants import (
     COMPOSER_SERVICE_NAME,
@@ -27,6 +34,75 @@ from dataproc_jupyter_plugin.commons.constants import (
     TAGS,
 )
 
+# Composer environment metadata, i.e. `(airflow_uri, bucket)`, keyed by
+# `(project_id, region_id, composer_name)`. Environments rarely change, so
+# this saves a Composer API call in front of every Airflow API call.
+_environments = cachetools.TTLCache(maxsize=256, ttl=10 * 60)
+
+# Error messages for environments that Composer reported as missing. These
+# are kept for a shorter time so that newly created environments show up.
+_missing_environments = cachetools.TTLCache(maxsize=256, ttl=60)
+
+# Airflow caps the page size of list APIs at 100 by default.
+PAGE_SIZE = 100
+PAGE_CONCURRENCY = 4
+
+# Scheduled job listings, keyed by the environment key plus the filters. The
+# UI refreshes the list often, so even a short lifetime saves most requests.
+_dag_lists = cachetools.TTLCache(maxsize=256, ttl=30)
+
+# DAG run histories of date ranges that ended in the past and hold no
+# unfinished runs. Finished runs don't change, so these are kept until the
+# DAG is deleted or the cache is full.
+_closed_dag_run_histories = cachetools.LRUCache(maxsize=256)
+
+# Airflow DAG run states that a run can no longer leave.
+FINISHED_DAG_RUN_STATES = ("success", "failed")
+
+# Airflow task instance states that a task can no longer leave.
+FINISHED_TASK_STATES = ("success", "failed", "skipped", "upstream_failed", "removed")
+
+# Seconds between polls for new log lines of a running task.
+TASK_LOG_POLL_INTERVAL = 5
+
+# Characters kept from the end of each task log in DAG run details, and the
+# number of task logs fetched at once for them.
+TASK_LOG_TAIL_SIZE = 64 * 1024
+TASK_LOG_CONCURRENCY = 8
+
+# Import errors of each environment and their fingerprint, keyed by the
+# environment key. The UI polls for import errors, and this keeps polls from
+# several tabs from each reading all of them from Airflow.
+_import_errors = cachetools.TTLCache(maxsize=256, ttl=15)
+
+# Number of environments listed at once by the job inventory.
+JOB_INVENTORY_CONCURRENCY = 4
+
+# Number of DAGs updated at once by bulk DAG operations.
+BULK_OPERATION_CONCURRENCY = 8
+BULK_ACTIONS = ("pause", "resume", "delete", "trigger")
+
+
+def _is_closed_range(end_date, dag_runs):
+    """Returns whether the runs of a date range can no longer change."""
+    try:
+        end = datetime.datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=datetime.timezone.utc)
+    return end < datetime.datetime.now(datetime.timezone.utc) and all(
+        dag_run.get("state") in FINISHED_DAG_RUN_STATES for dag_run in dag_runs
+    )
+
+
+def _delete_dag_file(bucket, dag_id):
+    bucket.blob(f"dags/dag_{dag_id}.py").delete()
+    # DAGs from older versions of the plugin have no metadata.
+    bucket.delete_blobs(
+        [bucket.blob(f"dags/dag_{dag_id}.json")], on_error=lambda blob: None
+    )
+
 
 class Client:
     def __init__(self, credentials, log, client_session):
@@ -49,7 +125,34 @@ class Client:
             "Authorization": f"Bearer {self._access_token}",
         }
 
+    def _environment_key(self, composer_name):
+        return (self.project_id, self.region_id, composer_name)
+
+    def forget_airflow_uri(self, composer_name):
+        """Drops the cached metadata for the given Composer environment."""
+        key = self._environment_key(composer_name)
+        _environments.pop(key, None)
+        _missing_environments.pop(key, None)
+        self.forget_dag_list(composer_name)
+
+    def forget_dag_list(self, composer_name):
+        """Drops the cached job listings for the given Composer environment."""
+        key = self._environment_key(composer_name)
+        for cached_key in [k for k in _dag_lists if k[:3] == key]:
+            _dag_lists.pop(cached_key, None)
+
+    def forget_dag_run_histories(self, composer_name, dag_id):
+        """Drops the cached run histories of the given DAG."""
+        key = self._environment_key(composer_name) + (dag_id,)
+        for cached_key in [k for k in _closed_dag_run_histories if k[:4] == key]:
+            _closed_dag_run_histories.pop(cached_key, None)
+
     async def get_airflow_uri(self, composer_name):
+        key = self._environment_key(composer_name)
+        if key in _environments:
+            return _environments[key]
+        if key in _missing_environments:
+            raise Exception(f"Error getting airflow uri: {_missing_environments[key]}")
         try:
             composer_url = await urls.gcp_service_url(COMPOSER_SERVICE_NAME)
             api_endpoint = f"{composer_url}v1/projects/{self.project_id}/locations/{self.region_id}/environments/{composer_name}"
@@ -60,33 +163,116 @@ class Client:
                     resp = await response.json()
                     airflow_uri = resp.get("config", {}).get("airflowUri", "")
                     bucket = resp.get("storageConfig", {}).get("bucket", "")
+                    _environments[key] = (airflow_uri, bucket)
                     return airflow_uri, bucket
                 else:
-                    raise Exception(
-                        f"Error getting airflow uri: {response.reason} {await response.text()}"
-                    )
+                    message = f"{response.reason} {await response.text()}"
+                    if response.status == 404:
+                        _missing_environments[key] = message
+                    raise Exception(message)
         except Exception as e:
             self.log.exception(f"Error getting airflow uri: {str(e)}")
             raise Exception(f"Error getting airflow uri: {str(e)}")
 
-    async def list_jobs(self, composer_name):
+    async def _list_page(self, api_endpoint, query, offset, error_message):
+        params = dict(query, limit=PAGE_SIZE, offset=offset)
+        api_endpoint = f"{api_endpoint}?{urllib.parse.urlencode(params)}"
+        async with self.client_session.get(
+            api_endpoint, headers=self.create_headers()
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                raise Exception(
+                    f"{error_message}: {response.reason} {await response.text()}"
+                )
+
+    async def _list_all(self, api_endpoint, query, items_key, error_message):
+        """Fetches every page of an Airflow list API.
+
+        The first page tells how many entries there are, and the remaining
+        pages are then fetched concurrently. Returns the entries in page order
+        and the total number of entries.
+        """
+        first_page = await self._list_page(api_endpoint, query, 0, error_message)
+        items = list(first_page.get(items_key) or [])
+        total_entries = first_page.get("total_entries", len(items))
+
+        semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+        async def _list(offset):
+            async with semaphore:
+                return await self._list_page(api_endpoint, query, offset, error_message)
+
+        pages = await asyncio.gather(
+            *[_list(offset) for offset in range(PAGE_SIZE, total_entries, PAGE_SIZE)]
+        )
+        for page in pages:
+            items.extend(page.get(items_key) or [])
+        return items, total_entries
+
+    async def list_jobs(self, composer_name, dag_id_pattern=None, paused=None):
+        """Lists the scheduled jobs of an environment across all result pages.
+
+        `dag_id_pattern` and `paused` are passed through to the Airflow API so
+        that filtering happens on the server.
+        """
         airflow_uri, bucket = await self.get_airflow_uri(composer_name)
+        key = self._environment_key(composer_name) + (dag_id_pattern, paused)
+        if key in _dag_lists:
+            return _dag_lists[key], bucket
         try:
-            api_endpoint = f"{airflow_uri}/api/v1/dags?tags={TAGS}"
-            async with self.client_session.get(
-                api_endpoint, headers=self.create_headers()
-            ) as response:
-                if response.status == 200:
-                    resp = await response.json()
-                    return resp, bucket
-                else:
-                    raise Exception(
-                        f"Error lsiting scheduled jobs: {response.reason} {await response.text()}"
-                    )
+            query = {"tags": TAGS}
+            if dag_id_pattern:
+                query["dag_id_pattern"] = dag_id_pattern
+            if paused is not None:
+                query["paused"] = str(paused).lower()
+            dags, total_entries = await self._list_all(
+                f"{airflow_uri}/api/v1/dags",
+                query,
+                "dags",
+                "Error lsiting scheduled jobs",
+            )
+            resp = {"dags": dags, "total_entries": total_entries}
+            _dag_lists[key] = resp
+            return resp, bucket
         except Exception as e:
             self.log.exception(f"Error getting dag list: {str(e)}")
+            self.forget_airflow_uri(composer_name)
             return {"error": str(e)}
 
+    async def list_jobs_in_environments(
+        self, composer_names, concurrency=JOB_INVENTORY_CONCURRENCY
+    ):
+        """Lists the scheduled jobs of several environments concurrently.
+
+        Returns the jobs of all environments sorted by DAG ID and environment,
+        each tagged with its `composer` environment and `bucket`. Environments
+        that could not be listed are reported in `errors` rather than failing
+        the whole inventory.
+        """
+
+        async def _list(composer_name):
+            try:
+                resp = await self.list_jobs(composer_name)
+            except Exception as e:
+                return composer_name, {"error": str(e)}
+            return composer_name, resp
+
+        jobs = []
+        errors = {}
+        async for composer_name, resp in tasks.bounded_as_completed(
+            [_list(composer_name) for composer_name in composer_names], concurrency
+        ):
+            if isinstance(resp, dict):
+                errors[composer_name] = resp.get("error")
+                continue
+            dag_list, bucket = resp
+            for dag in dag_list.get("dags", []):
+                jobs.append(dict(dag, composer=composer_name, bucket=bucket))
+        jobs.sort(key=lambda job: (job.get("dag_id", ""), job["composer"]))
+        return {"jobs": jobs, "errors": errors}
+
     async def delete_job(self, composer_name, dag_id, from_page):
         airflow_uri, bucket_name = await self.get_airflow_uri(composer_name)
         try:
@@ -97,18 +283,94 @@ class Client:
                     api_endpoint, headers=self.create_headers()
                 ) as response:
                     self.log.info(response)
-            bucket = storage.Client().bucket(bucket_name)
-            blob_name = f"dags/dag_{dag_id}.py"
-            blob = bucket.blob(blob_name)
-            blob.delete()
+            storage_client = await blocking.run(storage.Client)
+            await blocking.run(
+                _delete_dag_file, storage_client.bucket(bucket_name), dag_id
+            )
 
-            self.log.info(f"Deleted {blob_name} from bucket {bucket_name}")
+            self.log.info(f"Deleted dags/dag_{dag_id}.py from bucket {bucket_name}")
+            self.forget_dag_list(composer_name)
+            self.forget_dag_run_histories(composer_name, dag_id)
 
             return 0
         except Exception as e:
             self.log.exception(f"Error deleting DAG: {str(e)}")
+            self.forget_airflow_uri(composer_name)
             return {"error": str(e)}
 
+    async def bulk_update_jobs(
+        self, composer_name, dag_ids, action, concurrency=BULK_OPERATION_CONCURRENCY
+    ):
+        """Pauses, resumes, deletes or triggers many DAGs of an environment.
+
+        The DAGs are updated concurrently. A deleted DAG's file is removed
+        from the environment's bucket once Airflow has deleted the DAG.
+        Returns a result per DAG, in the order of `dag_ids`, with either a
+        `status` of 0 or an `error`.
+        """
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Invalid bulk action: {action}")
+        airflow_uri, bucket_name = await self.get_airflow_uri(composer_name)
+        if action == "delete":
+            storage_client = await blocking.run(storage.Client)
+            bucket = storage_client.bucket(bucket_name)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        def _request(dag_id):
+            api_endpoint = f"{airflow_uri}/api/v1/dags/{dag_id}"
+            if action == "delete":
+                return self.client_session.delete(
+                    api_endpoint, headers=self.create_headers()
+                )
+            if action == "trigger":
+                return self.client_session.post(
+                    f"{api_endpoint}/dagRuns",
+                    headers=self.create_headers(),
+                    json={"conf": {}},
+                )
+            return self.client_session.patch(
+                api_endpoint,
+                json={"is_paused": action == "pause"},
+                headers=self.create_headers(),
+            )
+
+        async def _apply(dag_id):
+            async with _request(dag_id) as response:
+                # A DAG that Airflow never parsed can still have a file.
+                if not (
+                    response.status in (200, 204)
+                    or (action == "delete" and response.status == 404)
+                ):
+                    return {
+                        "dag_id": dag_id,
+                        "error": f"Error running {action} on DAG: {response.reason} {await response.text()}",
+                    }
+            if action == "delete":
+                try:
+                    await blocking.run(_delete_dag_file, bucket, dag_id)
+                except Exception as e:
+                    self.log.exception(f"Error deleting DAG file: {str(e)}")
+                    return {
+                        "dag_id": dag_id,
+                        "error": f"Error deleting DAG file: {str(e)}",
+                    }
+            return {"dag_id": dag_id, "status": 0}
+
+        async def _apply_bounded(dag_id):
+            try:
+                async with semaphore:
+                    return await _apply(dag_id)
+            except Exception as e:
+                return {"dag_id": dag_id, "error": str(e)}
+
+        results = await asyncio.gather(*[_apply_bounded(dag_id) for dag_id in dag_ids])
+        if action == "delete":
+            for dag_id in dag_ids:
+                self.forget_dag_run_histories(composer_name, dag_id)
+        if action != "trigger":
+            self.forget_dag_list(composer_name)
+        return results
+
     async def update_job(self, composer_name, dag_id, status):
         airflow_uri, bucket = await self.get_airflow_uri(composer_name)
         try:
@@ -119,14 +381,17 @@ class Client:
                 api_endpoint, json=data, headers=self.create_headers()
             ) as response:
                 if response.status == 200:
+                    self.forget_dag_list(composer_name)
                     return 0
                 else:
                     self.log.exception("Error updating status")
+                    self.forget_airflow_uri(composer_name)
                     return {
                         "error": f"Error updating Airflow DAG status: {response.reason} {await response.text()}"
                     }
         except Exception as e:
             self.log.exception(f"Error updating status: {str(e)}")
+            self.forget_airflow_uri(composer_name)
             return {"error": str(e)}
 
     async def list_dag_runs(self, composer_name, dag_id, start_date, end_date, offset):
@@ -145,6 +410,51 @@ class Client:
                     )
         except Exception as e:
             self.log.exception(f"Error fetching dag run list: {str(e)}")
+            self.forget_airflow_uri(composer_name)
+            return {"error": str(e)}
+
+    async def dag_run_history(self, composer_name, dag_id, start_date, end_date):
+        """Returns every run of a DAG in a date range, with per-day counts.
+
+        Runs are grouped by the UTC day they started on, or by their logical
+        date if they have not started yet. `days` maps each day to the number
+        of runs in each state, and `states` holds the totals for the range.
+        """
+        airflow_uri, bucket = await self.get_airflow_uri(composer_name)
+        key = self._environment_key(composer_name) + (dag_id, start_date, end_date)
+        if key in _closed_dag_run_histories:
+            return _closed_dag_run_histories[key]
+        try:
+            dag_runs, total_entries = await self._list_all(
+                f"{airflow_uri}/api/v1/dags/{dag_id}/dagRuns",
+                {
+                    "execution_date_gte": start_date,
+                    "execution_date_lte": end_date,
+                    "order_by": "execution_date",
+                },
+                "dag_runs",
+                "Error listing dag runs",
+            )
+            days = {}
+            states = {}
+            for dag_run in dag_runs:
+                day = (dag_run.get("start_date") or dag_run["execution_date"])[:10]
+                state = dag_run.get("state")
+                day_states = days.setdefault(day, {})
+                day_states[state] = day_states.get(state, 0) + 1
+                states[state] = states.get(state, 0) + 1
+            resp = {
+                "dag_runs": dag_runs,
+                "total_entries": total_entries,
+                "days": days,
+                "states": states,
+            }
+            if _is_closed_range(end_date, dag_runs):
+                _closed_dag_run_histories[key] = resp
+            return resp
+        except Exception as e:
+            self.log.exception(f"Error fetching dag run history: {str(e)}")
+            self.forget_airflow_uri(composer_name)
             return {"error": str(e)}
 
     async def list_dag_run_task(self, composer_name, dag_id, dag_run_id):
@@ -165,6 +475,7 @@ class Client:
                     )
         except Exception as e:
             self.log.exception(f"Error fetching dag run task list: {str(e)}")
+            self.forget_airflow_uri(composer_name)
             return {"error": str(e)}
 
     async def list_dag_run_task_logs(
@@ -185,8 +496,116 @@ class Client:
                     )
         except Exception as e:
             self.log.exception(f"Error fetching dag run task logs: {str(e)}")
+            self.forget_airflow_uri(composer_name)
             return {"error": str(e)}
 
+    async def _get_task_log_chunk(self, api_endpoint, token):
+        params = {"full_content": "false"}
+        if token:
+            params["token"] = token
+        # The continuation token is only returned with JSON responses.
+        headers = dict(self.create_headers(), Accept=CONTENT_TYPE)
+        async with self.client_session.get(
+            f"{api_endpoint}?{urllib.parse.urlencode(params)}", headers=headers
+        ) as response:
+            if response.status == 200:
+                resp = await response.json()
+                return resp.get("content") or "", resp.get("continuation_token")
+            else:
+                raise Exception(
+                    f"Error listing dag run task logs: {response.reason} {await response.text()}"
+                )
+
+    async def _get_task_state(self, airflow_uri, dag_id, dag_run_id, task_id):
+        api_endpoint = f"{airflow_uri}/api/v1/dags/{dag_id}/dagRuns/{dag_run_id}/taskInstances/{task_id}"
+        async with self.client_session.get(
+            api_endpoint, headers=self.create_headers()
+        ) as response:
+            if response.status == 200:
+                resp = await response.json()
+                return resp.get("state")
+            else:
+                raise Exception(
+                    f"Error getting task instance: {response.reason} {await response.text()}"
+                )
+
+    async def stream_dag_run_task_logs(
+        self,
+        composer_name,
+        dag_id,
+        dag_run_id,
+        task_id,
+        task_try_number,
+        token=None,
+        follow=False,
+    ):
+        """Yields the new lines of a task log together with a continuation token.
+
+        Passing the last token received resumes the log after the lines that
+        were already read. With `follow` the log is polled until the task has
+        finished, otherwise only the lines available now are returned.
+        """
+        airflow_uri, bucket = await self.get_airflow_uri(composer_name)
+        api_endpoint = f"{airflow_uri}/api/v1/dags/{dag_id}/dagRuns/{dag_run_id}/taskInstances/{task_id}/logs/{task_try_number}"
+        try:
+            while True:
+                finished = (not follow) or (
+                    await self._get_task_state(airflow_uri, dag_id, dag_run_id, task_id)
+                    in FINISHED_TASK_STATES
+                )
+                content, token = await self._get_task_log_chunk(api_endpoint, token)
+                if content:
+                    yield {"content": content, "continuation_token": token}
+                if finished:
+                    return
+                await asyncio.sleep(TASK_LOG_POLL_INTERVAL)
+        except Exception as e:
+            self.log.exception(f"Error streaming dag run task logs: {str(e)}")
+            self.forget_airflow_uri(composer_name)
+            yield {"error": str(e)}
+
+    async def dag_run_details(
+        self, composer_name, dag_id, dag_run_id, tail_size=TASK_LOG_TAIL_SIZE
+    ):
+        """Returns the task instances of a DAG run with the logs of their latest try.
+
+        The logs are fetched concurrently, and only their last `tail_size`
+        characters are kept, starting from a line boundary. A task whose log
+        could not be fetched gets an `error` in place of its log.
+        """
+        resp = await self.list_dag_run_task(composer_name, dag_id, dag_run_id)
+        if "error" in resp:
+            return resp
+        semaphore = asyncio.Semaphore(TASK_LOG_CONCURRENCY)
+
+        async def _tail_log(task_instance):
+            if not task_instance.get("try_number"):
+                return None
+            async with semaphore:
+                log = await self.list_dag_run_task_logs(
+                    composer_name,
+                    dag_id,
+                    dag_run_id,
+                    task_instance["task_id"],
+                    task_instance["try_number"],
+                )
+            if "error" in log:
+                return log
+            content = log["content"]
+            truncated = len(content) > tail_size
+            if truncated:
+                content = content[-tail_size:]
+                content = content[content.find("\n") + 1 :]
+            return {"content": content, "truncated": truncated}
+
+        task_instances = resp.get("task_instances", [])
+        logs = await asyncio.gather(
+            *[_tail_log(task_instance) for task_instance in task_instances]
+        )
+        for task_instance, log in zip(task_instances, logs):
+            task_instance["log"] = log
+        return resp
+
     async def get_dag_file(self, dag_id, bucket_name):
         try:
             file_path = f"dags/dag_{dag_id}.py"
@@ -209,7 +628,43 @@ class Client:
             self.log.exception(f"Error reading dag file: {str(e)}")
             return {"error": str(e)}
 
+    async def get_dag_metadata(self, dag_id, bucket_name):
+        """Returns the metadata written alongside a DAG when it was generated.
+
+        DAGs generated by older versions of the plugin have no metadata, in
+        which case `None` is returned.
+        """
+        file_path = f"dags/dag_{dag_id}.json"
+        encoded_path = urllib.parse.quote(file_path, safe="")
+        storage_url = await urls.gcp_service_url(
+            STORAGE_SERVICE_NAME, default_url=STORAGE_SERVICE_DEFAULT_URL
+        )
+        api_endpoint = f"{storage_url}b/{bucket_name}/o/{encoded_path}?alt=media"
+        async with self.client_session.get(
+            api_endpoint, headers=self.create_headers()
+        ) as response:
+            if response.status == 200:
+                return json.loads(await response.read())
+            elif response.status == 404:
+                return None
+            else:
+                raise Exception(
+                    f"Error getting dag metadata: {response.reason} {await response.text()}"
+                )
+
     async def edit_jobs(self, dag_id, bucket_name):
+        try:
+            metadata = await self.get_dag_metadata(dag_id, bucket_name)
+            if metadata is not None:
+                metadata.pop("version", None)
+                return metadata
+            self.log.info(f"No metadata for dag {dag_id}, parsing the dag file")
+            return await self._edit_legacy_job(dag_id, bucket_name)
+        except Exception as e:
+            self.log.exception(f"Error downloading dag file: {str(e)}")
+
+    async def _edit_legacy_job(self, dag_id, bucket_name):
+        """Recovers the job settings by parsing a DAG that has no metadata."""
         try:
             cluster_name = ""
             serverless_name = ""
@@ -228,17 +683,16 @@ class Client:
                         input_notebook = line.split("=")[-1].strip().strip("'\"")
                         break
 
-                for line in file_content.split("\n"):
-                    match = re.search(pattern, file_content, re.DOTALL)
-                    if match:
-                        parameters_yaml = match.group(1)
-                        parameters_list = [
-                            line.strip()
-                            for line in parameters_yaml.split("\n")
-                            if line.strip()
-                        ]
-                    else:
-                        parameters_list = []
+                match = re.search(pattern, file_content, re.DOTALL)
+                if match:
+                    parameters_yaml = match.group(1)
+                    parameters_list = [
+                        line.strip()
+                        for line in parameters_yaml.split("\n")
+                        if line.strip()
+                    ]
+                else:
+                    parameters_list = []
 
                 for line in file_content.split("\n"):
                     if "email" in line:
@@ -323,24 +777,45 @@ class Client:
         except Exception as e:
             self.log.exception(f"Error downloading dag file: {str(e)}")
 
-    async def list_import_errors(self, composer):
+    async def list_import_errors(self, composer, limit=None, offset=0, since=None):
+        """Lists the DAG import errors of an environment, newest first.
+
+        The response holds a `fingerprint` of the full list, which changes
+        whenever an import error is added, removed or updated. If `since` is
+        the current fingerprint no import errors are returned, and otherwise
+        `limit` and `offset` select a page of them. Only the response is
+        paginated: the fingerprint covers the full list, so every page of it
+        is fetched from Airflow and cached.
+        """
         airflow_uri, bucket = await self.get_airflow_uri(composer)
+        key = self._environment_key(composer)
         try:
-            api_endpoint = (
-                f"{airflow_uri}/api/v1/importErrors?order_by=-import_error_id"
-            )
-            async with self.client_session.get(
-                api_endpoint, headers=self.create_headers()
-            ) as response:
-                if response.status == 200:
-                    resp = await response.json()
-                    return resp
-                else:
-                    raise Exception(
-                        f"Error listing import errors: {response.reason} {await response.text()}"
-                    )
+            if key not in _import_errors:
+                import_errors, total_entries = await self._list_all(
+                    f"{airflow_uri}/api/v1/importErrors",
+                    {"order_by": "-import_error_id"},
+                    "import_errors",
+                    "Error listing import errors",
+                )
+                fingerprint = hashlib.sha256(
+                    json.dumps(import_errors, sort_keys=True).encode()
+                ).hexdigest()
+                _import_errors[key] = (import_errors, total_entries, fingerprint)
+            import_errors, total_entries, fingerprint = _import_errors[key]
+            if since == fingerprint:
+                import_errors = []
+            else:
+                end = None if limit is None else offset + limit
+                import_errors = import_errors[offset:end]
+            return {
+                "import_errors": import_errors,
+                "total_entries": total_entries,
+                "fingerprint": fingerprint,
+                "changed": since != fingerprint,
+            }
         except Exception as e:
             self.log.exception(f"Error fetching import error list: {str(e)}")
+            self.forget_airflow_uri(composer)
             return {"error": str(e)}
 
     async def dag_trigger(self, dag_id, composer):
@@ -360,4 +835,5 @@ class Client:
                     )
         except Exception as e:
             self.log.exception(f"Error triggering dag: {str(e)}")
+            self.forget_airflow_uri(composer)
             return {"error": str(e)}
@@ -18,6 +18,7 @@ from google.cloud import compute_v1
 import google.oauth2.credentials as oauth2
 
 from dataproc_jupyter_plugin import urls
+from dataproc_jupyter_plugin.commons import blocking
 from dataproc_jupyter_plugin.commons.constants import (
     CONTENT_TYPE,
 )
@@ -46,16 +47,16 @@ class Client:
 
     async def list_region(self):
         try:
-            regions = []
             credentials = oauth2.Credentials(token=self._access_token)
-            regions_client = compute_v1.RegionsClient(credentials=credentials)
             request = compute_v1.ListRegionsRequest(
                 project=self.project_id,
             )
-            response = regions_client.list(request=request)
-            for item in response:
-                regions.append(item.name)
-            return regions
+
+            def _list_regions():
+                regions_client = compute_v1.RegionsClient(credentials=credentials)
+                return [item.name for item in regions_client.list(request=request)]
+
+            return await blocking.run(_list_regions)
 
         except Exception as e:
             self.log.exception(f"Error fetching regions: {str(e)}")
@@ -65,11 +66,15 @@ class Client:
         try:
             networks = []
             credentials = oauth2.Credentials(token=self._access_token)
-            networks_client = compute_v1.NetworksClient(credentials=credentials)
             request = compute_v1.ListNetworksRequest(
                 project=self.project_id,
             )
-            response = networks_client.list(request=request)
+
+            def _list_networks():
+                networks_client = compute_v1.NetworksClient(credentials=credentials)
+                return networks_client.list(request=request)
+
+            response = await blocking.run(_list_networks)
             for item in response.items:
                 networks.append(
                     proto.Message.to_dict(
@@ -88,12 +93,18 @@ class Client:
         try:
             sub_networks = []
             credentials = oauth2.Credentials(token=self._access_token)
-            subnetworks_client = compute_v1.SubnetworksClient(credentials=credentials)
             request = compute_v1.ListSubnetworksRequest(
                 project=self.project_id,
                 region=region_id,
             )
-            response = subnetworks_client.list(request=request)
+
+            def _list_subnetworks():
+                subnetworks_client = compute_v1.SubnetworksClient(
+                    credentials=credentials
+                )
+                return subnetworks_client.list(request=request)
+
+            response = await blocking.run(_list_subnetworks)
             for item in response.items:
                 if network_id in item.network:
                     sub_networks.append(
@@ -113,11 +124,19 @@ class Client:
         try:
             shared_networks = []
             credentials = oauth2.Credentials(token=self._access_token)
-            subnetworks_client = compute_v1.SubnetworksClient(credentials=credentials)
             request = compute_v1.ListUsableSubnetworksRequest(
                 project=project_id,
             )
-            response = subnetworks_client.list_usable(request=request)
+
+            def _list_usable_subnetworks():
+                subnetworks_client = compute_v1.SubnetworksClient(
+                    credentials=credentials
+                )
+                # Iterating the pager fetches the remaining pages, so it has
+                # to happen on the worker thread as well.
+                return list(subnetworks_client.list_usable(request=request))
+
+            response = await blocking.run(_list_usable_subnetworks)
             for item in response:
                 if region_id in item.subnetwork:
                     shared_networks.append(
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
 import os
 import shutil
 import subprocess
@@ -20,36 +22,30 @@ from datetime import datetime, timedelta
 from google.cloud import storage
 from google.api_core.exceptions import NotFound
 import google.oauth2.credentials as oauth2
-import aiofiles
 
-import aiohttp
 import pendulum
 from google.cloud.jupyter_config.config import gcp_account
-from jinja2 import Environment, PackageLoader, select_autoescape
 
-from dataproc_jupyter_plugin import urls
+from dataproc_jupyter_plugin.commons import blocking, gcs, tasks, templates
 from dataproc_jupyter_plugin.commons.commands import async_run_gsutil_subcommand
 from dataproc_jupyter_plugin.commons.constants import (
-    COMPOSER_SERVICE_NAME,
     CONTENT_TYPE,
     GCS,
-    PACKAGE_NAME,
     WRAPPER_PAPPERMILL_FILE,
 )
 from dataproc_jupyter_plugin.models.models import DescribeJob
 from dataproc_jupyter_plugin.services import airflow
 
-
 unique_id = str(uuid.uuid4().hex)
 job_id = ""
 job_name = ""
-TEMPLATES_FOLDER_PATH = "dagTemplates"
-ROOT_FOLDER = PACKAGE_NAME
+# Number of jobs whose files are uploaded at once when creating jobs in bulk.
+DAG_UPLOAD_CONCURRENCY = 8
+# Version of the `dags/dag_<name>.json` metadata written next to each DAG.
+DAG_METADATA_VERSION = 1
 
 
 class Client:
-    client_session = aiohttp.ClientSession()
-
     def __init__(self, credentials, log, client_session):
         self.log = log
         if not (
@@ -62,6 +58,7 @@ class Client:
         self._access_token = credentials["access_token"]
         self.project_id = credentials["project_id"]
         self.region_id = credentials["region_id"]
+        self.client_session = client_session
         self.airflow_client = airflow.Client(credentials, log, client_session)
 
     def create_headers(self):
@@ -72,20 +69,8 @@ class Client:
 
     async def get_bucket(self, runtime_env):
         try:
-            composer_url = await urls.gcp_service_url(COMPOSER_SERVICE_NAME)
-            api_endpoint = f"{composer_url}v1/projects/{self.project_id}/locations/{self.region_id}/environments/{runtime_env}"
-            headers = self.create_headers()
-            async with self.client_session.get(
-                api_endpoint, headers=headers
-            ) as response:
-                if response.status == 200:
-                    resp = await response.json()
-                    gcs_dag_path = resp.get("storageConfig", {}).get("bucket", "")
-                    return gcs_dag_path
-                else:
-                    raise Exception(
-                        f"Error getting composer bucket: {response.reason} {await response.text()}"
-                    )
+            _, gcs_dag_path = await self.airflow_client.get_airflow_uri(runtime_env)
+            return gcs_dag_path
         except Exception as e:
             self.log.exception(f"Error getting bucket name: {str(e)}")
             raise Exception(f"Error getting composer bucket: {str(e)}")
@@ -94,9 +79,12 @@ class Client:
         try:
             if not bucket_name:
                 raise ValueError("Bucket name cannot be empty")
-            bucket = storage.Client().bucket(bucket_name)
-            blob = bucket.blob(file_path)
-            return blob.exists()
+
+            def _exists():
+                bucket = storage.Client().bucket(bucket_name)
+                return bucket.blob(file_path).exists()
+
+            return await blocking.run(_exists)
         except Exception as error:
             self.log.exception(f"Error checking file: {error}")
             raise IOError(f"Error creating dag: {error}")
@@ -105,14 +93,8 @@ class Client:
         self, gcs_dag_bucket, file_path=None, template_name=None, destination_dir=None
     ):
         try:
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(gcs_dag_bucket)
             if template_name:
-                env = Environment(
-                    loader=PackageLoader(PACKAGE_NAME, TEMPLATES_FOLDER_PATH),
-                    autoescape=select_autoescape(["py"]),
-                )
-                file_path = env.get_template(template_name).filename
+                file_path = templates.template_path(template_name)
 
             if not file_path:
                 raise ValueError("No file path or template name provided for upload.")
@@ -120,27 +102,23 @@ class Client:
                 blob_name = f"{destination_dir}/{file_path.split('/')[-1]}"
             else:
                 blob_name = f"{file_path.split('/')[-1]}"
-
-            blob = bucket.blob(blob_name)
-            blob.upload_from_filename(file_path)
-            self.log.info(f"File {file_path} uploaded to gcs successfully")
+            if await gcs.upload_file(gcs_dag_bucket, blob_name, file_path):
+                self.log.info(f"File {file_path} uploaded to gcs successfully")
+            else:
+                self.log.info(f"File {file_path} is unchanged in gcs")
 
         except Exception as error:
             self.log.exception(f"Error uploading file to GCS: {str(error)}")
             raise IOError(str(error))
 
-    def prepare_dag(self, job, gcs_dag_bucket, dag_file):
+    def prepare_dag(self, job, gcs_dag_bucket, owner=None):
+        """Renders the DAG file for a job and returns its contents."""
         self.log.info("Generating dag file")
-        DAG_TEMPLATE_CLUSTER_V1 = "pysparkJobTemplate-v1.txt"
-        DAG_TEMPLATE_SERVERLESS_V1 = "pysparkBatchTemplate-v1.txt"
-        environment = Environment(
-            loader=PackageLoader("dataproc_jupyter_plugin", TEMPLATES_FOLDER_PATH)
-        )
-
         gcp_project_id = self.project_id
         gcp_region_id = self.region_id
-        user = gcp_account()
-        owner = user.split("@")[0]  # getting username from email
+        if owner is None:
+            user = gcp_account()
+            owner = user.split("@")[0]  # getting username from email
         if job.schedule_value == "":
             schedule_interval = "@once"
         else:
@@ -162,7 +140,7 @@ class Client:
         else:
             parameters = ""
         if job.mode_selected == "cluster":
-            template = environment.get_template(DAG_TEMPLATE_CLUSTER_V1)
+            template = templates.get_template(templates.DAG_TEMPLATE_CLUSTER_V1)
             if not job.input_filename.startswith(GCS):
                 input_notebook = f"gs://{gcs_dag_bucket}/dataproc-notebooks/{job.name}/input_notebooks/{job.input_filename}"
             else:
@@ -181,7 +159,7 @@ class Client:
                 time_zone=time_zone,
             )
         else:
-            template = environment.get_template(DAG_TEMPLATE_SERVERLESS_V1)
+            template = templates.get_template(templates.DAG_TEMPLATE_SERVERLESS_V1)
             job_dict = job.dict()
             phs_path = (
                 job_dict.get("serverless_name", {})
@@ -233,20 +211,20 @@ class Client:
                 metastore_service=metastore_service,
                 version=version,
             )
+        return content
+
+    def save_local_dag(self, job, dag_file, content):
+        """Writes a copy of a rendered DAG to `./scheduled-jobs` for debugging."""
         LOCAL_DAG_FILE_LOCATION = f"./scheduled-jobs/{job.name}"
         file_path = os.path.join(LOCAL_DAG_FILE_LOCATION, dag_file)
         os.makedirs(LOCAL_DAG_FILE_LOCATION, exist_ok=True)
         with open(file_path, mode="w", encoding="utf-8") as message:
             message.write(content)
-        env = Environment(
-            loader=PackageLoader(PACKAGE_NAME, "dagTemplates"),
-            autoescape=select_autoescape(["py"]),
-        )
-        wrapper_papermill_path = env.get_template("wrapper_papermill.py").filename
+        wrapper_papermill_path = templates.template_path(WRAPPER_PAPPERMILL_FILE)
         shutil.copy2(wrapper_papermill_path, LOCAL_DAG_FILE_LOCATION)
         return file_path
 
-    async def execute(self, input_data):
+    async def execute(self, input_data, save_local_copy=False):
         try:
             job = DescribeJob(**input_data)
             global job_id
@@ -255,39 +233,162 @@ class Client:
             job_name = job.name
             dag_file = f"dag_{job_name}.py"
             gcs_dag_bucket = await self.get_bucket(job.composer_environment_name)
-            wrapper_pappermill_file_path = WRAPPER_PAPPERMILL_FILE
-
-            if await self.check_file_exists(
-                gcs_dag_bucket, wrapper_pappermill_file_path
-            ):
-                print(
-                    f"The file gs://{gcs_dag_bucket}/{wrapper_pappermill_file_path} exists."
-                )
-            else:
-                await self.upload_to_gcs(
-                    gcs_dag_bucket,
-                    template_name=WRAPPER_PAPPERMILL_FILE,
-                    destination_dir="dataproc-notebooks",
-                )
-                print(
-                    f"The file gs://{gcs_dag_bucket}/{wrapper_pappermill_file_path} does not exist."
-                )
-            if not job.input_filename.startswith(GCS):
-                await self.upload_to_gcs(
-                    gcs_dag_bucket,
-                    file_path=f"./{job.input_filename}",
-                    destination_dir=f"dataproc-notebooks/{job_name}/input_notebooks",
-                )
-            file_path = self.prepare_dag(job, gcs_dag_bucket, dag_file)
-            await self.upload_to_gcs(
-                gcs_dag_bucket, file_path=file_path, destination_dir="dags"
-            )
+            await self.upload_papermill_wrapper(gcs_dag_bucket)
+            content = self.prepare_dag(job, gcs_dag_bucket)
+            if save_local_copy:
+                self.save_local_dag(job, dag_file, content)
+            await self.upload_job_files(job, gcs_dag_bucket, dag_file, content)
             return {"status": 0}
         except Exception as e:
             return {"error": str(e)}
 
+    async def upload_papermill_wrapper(self, gcs_dag_bucket):
+        wrapper_pappermill_file_path = WRAPPER_PAPPERMILL_FILE
+        if await self.check_file_exists(gcs_dag_bucket, wrapper_pappermill_file_path):
+            self.log.info(
+                f"The file gs://{gcs_dag_bucket}/{wrapper_pappermill_file_path} exists."
+            )
+        else:
+            await self.upload_to_gcs(
+                gcs_dag_bucket,
+                template_name=WRAPPER_PAPPERMILL_FILE,
+                destination_dir="dataproc-notebooks",
+            )
+            self.log.info(
+                f"Uploaded gs://{gcs_dag_bucket}/dataproc-notebooks/{wrapper_pappermill_file_path}."
+            )
+
+    def prepare_dag_metadata(self, job, gcs_dag_bucket):
+        """Returns the job settings that the edit form is populated from.
+
+        The values mirror what `airflow.Client.edit_jobs` used to scrape out of
+        the generated DAG file.
+        """
+        if not job.input_filename.startswith(GCS):
+            input_notebook = f"gs://{gcs_dag_bucket}/dataproc-notebooks/{job.name}/input_notebooks/{job.input_filename}"
+        else:
+            input_notebook = job.input_filename
+        serverless_name = (
+            (job.serverless_name or {}).get("jupyterSession", {}).get("displayName", "")
+        )
+        return {
+            "version": DAG_METADATA_VERSION,
+            "input_filename": input_notebook,
+            "parameters": [
+                item.replace(":", ": ").strip() for item in job.parameters or []
+            ],
+            "mode_selected": (
+                "cluster" if job.mode_selected == "cluster" else "serverless"
+            ),
+            "cluster_name": job.cluster_name or "",
+            "serverless_name": serverless_name,
+            "retry_count": job.retry_count,
+            "retry_delay": job.retry_delay,
+            "email_failure": str(job.email_failure),
+            "email_delay": str(job.email_delay),
+            "email_success": str(job.email_success),
+            "email": job.email or [],
+            "schedule_value": job.schedule_value or "@once",
+            "stop_cluster": str(job.stop_cluster),
+            "time_zone": job.time_zone or "",
+        }
+
+    async def upload_job_files(self, job, gcs_dag_bucket, dag_file, content):
+        """Uploads a job's input notebook, its rendered DAG and its metadata."""
+        if not job.input_filename.startswith(GCS):
+            await self.upload_to_gcs(
+                gcs_dag_bucket,
+                file_path=f"./{job.input_filename}",
+                destination_dir=f"dataproc-notebooks/{job.name}/input_notebooks",
+            )
+        # The metadata sidecar goes up first, so that every DAG has one.
+        metadata_file = f"{os.path.splitext(dag_file)[0]}.json"
+        metadata = self.prepare_dag_metadata(job, gcs_dag_bucket)
+        for file_name, data in [
+            (metadata_file, json.dumps(metadata, sort_keys=True)),
+            (dag_file, content),
+        ]:
+            try:
+                if await gcs.upload_string(gcs_dag_bucket, f"dags/{file_name}", data):
+                    self.log.info(f"File {file_name} uploaded to gcs successfully")
+                else:
+                    self.log.info(f"File {file_name} is unchanged in gcs")
+            except Exception as error:
+                self.log.exception(f"Error uploading file to GCS: {str(error)}")
+                raise IOError(str(error))
+
+    async def _prepare_environment(self, composer_environment_name):
+        gcs_dag_bucket = await self.get_bucket(composer_environment_name)
+        await self.upload_papermill_wrapper(gcs_dag_bucket)
+        return gcs_dag_bucket
+
+    async def execute_batch(
+        self, jobs_data, concurrency=DAG_UPLOAD_CONCURRENCY, save_local_copy=False
+    ):
+        """Creates the DAGs for many jobs, sharing the work they have in common.
+
+        The bucket of each Composer environment is resolved, and the papermill
+        wrapper uploaded, once per environment. All DAGs are rendered in
+        memory before the job files are uploaded concurrently. Returns a result for
+        every job, in the order they were given.
+        """
+        results = [None] * len(jobs_data)
+        jobs = {}
+        for index, input_data in enumerate(jobs_data):
+            try:
+                jobs[index] = DescribeJob(**input_data)
+            except Exception as e:
+                results[index] = {"error": str(e)}
+
+        environments = sorted({job.composer_environment_name for job in jobs.values()})
+        buckets = dict(
+            zip(
+                environments,
+                await asyncio.gather(
+                    *[self._prepare_environment(env) for env in environments],
+                    return_exceptions=True,
+                ),
+            )
+        )
+
+        async def _upload(index, job, gcs_dag_bucket, dag_file, content):
+            try:
+                await self.upload_job_files(job, gcs_dag_bucket, dag_file, content)
+                return index, {"status": 0}
+            except Exception as e:
+                return index, {"error": str(e)}
+
+        uploads = []
+        owner = None
+        for index, job in jobs.items():
+            gcs_dag_bucket = buckets[job.composer_environment_name]
+            if isinstance(gcs_dag_bucket, Exception):
+                results[index] = {"error": str(gcs_dag_bucket)}
+                continue
+            try:
+                if owner is None:
+                    user = await blocking.run(gcp_account)
+                    owner = user.split("@")[0]  # getting username from email
+                dag_file = f"dag_{job.name}.py"
+                content = self.prepare_dag(job, gcs_dag_bucket, owner)
+                if save_local_copy:
+                    self.save_local_dag(job, dag_file, content)
+            except Exception as e:
+                results[index] = {"error": str(e)}
+                continue
+            uploads.append(_upload(index, job, gcs_dag_bucket, dag_file, content))
+
+        async for index, result in tasks.bounded_as_completed(uploads, concurrency):
+            results[index] = result
+        return results
+
     async def download_dag_output(
-        self, composer_environment_name, bucket_name, dag_id, dag_run_id
+        self,
+        composer_environment_name,
+        bucket_name,
+        dag_id,
+        dag_run_id,
+        destination_dir=".",
     ):
         try:
             await self.airflow_client.list_dag_run_task(
@@ -298,17 +399,14 @@ class Client:
 
         try:
             credentials = oauth2.Credentials(self._access_token)
-            storage_client = storage.Client(credentials=credentials)
             blob_name = (
                 f"dataproc-output/{dag_id}/output-notebooks/{dag_id}_{dag_run_id}.ipynb"
             )
-            bucket = storage_client.bucket(bucket_name)
-            blob = bucket.blob(blob_name)
             original_file_name = os.path.basename(blob_name)
-            destination_file_name = os.path.join(".", original_file_name)
-            async with aiofiles.open(destination_file_name, "wb") as f:
-                file_data = blob.download_as_bytes()
-                await f.write(file_data)
+            destination_file_name = os.path.join(destination_dir, original_file_name)
+            await gcs.download_to_file(
+                credentials, bucket_name, blob_name, destination_file_name
+            )
             self.log.info(
                 f"Output notebook file '{original_file_name}' downloaded successfully"
             )
@@ -316,3 +414,44 @@ class Client:
         except Exception as error:
             self.log.exception(f"Error downloading output notebook file: {str(error)}")
             return {"error": str(error)}
+
+    async def download_dag_outputs(
+        self,
+        composer_environment_name,
+        bucket_name,
+        dag_runs,
+        destination_dir=".",
+        concurrency=gcs.OUTPUT_DOWNLOAD_CONCURRENCY,
+    ):
+        """Downloads the output notebooks of many DAG runs concurrently.
+
+        `dag_runs` is a list of `(dag_id, dag_run_id)` pairs. A result is
+        yielded for each run as soon as its download finishes.
+        """
+
+        async def _download(dag_id, dag_run_id):
+            status = await self.download_dag_output(
+                composer_environment_name,
+                bucket_name,
+                dag_id,
+                dag_run_id,
+                destination_dir,
+            )
+            result = {
+                "dag_id": dag_id,
+                "dag_run_id": dag_run_id,
+                "file_path": os.path.join(
+                    destination_dir, f"{dag_id}_{dag_run_id}.ipynb"
+                ),
+            }
+            if status == 0:
+                result["status"] = status
+            else:
+                result.update(status)
+            return result
+
+        async for result in tasks.bounded_as_completed(
+            [_download(dag_id, dag_run_id) for dag_id, dag_run_id in dag_runs],
+            concurrency,
+        ):
+            yield result
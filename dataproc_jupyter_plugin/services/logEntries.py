@@ -15,6 +15,7 @@
 from google.cloud import logging
 import google.oauth2.credentials as oauth2
 
+from dataproc_jupyter_plugin.commons import blocking
 from dataproc_jupyter_plugin.commons.constants import (
     CONTENT_TYPE,
 )
@@ -42,18 +43,18 @@ class Client:
 
     async def list_log_entries(self, filter_query=None):
         try:
-            logs = []
             credentials = oauth2.Credentials(token=self._access_token)
-            logging_client = logging.Client(
-                project=self.project_id, credentials=credentials
-            )
-            log_entries = logging_client.list_entries(
-                filter_=filter_query, page_size=1000, order_by="timestamp desc"
-            )
-            for item in log_entries:
-                log_dict = item.to_api_repr()
-                logs.append(log_dict)
-            return logs
+
+            def _list_entries():
+                logging_client = logging.Client(
+                    project=self.project_id, credentials=credentials
+                )
+                log_entries = logging_client.list_entries(
+                    filter_=filter_query, page_size=1000, order_by="timestamp desc"
+                )
+                return [item.to_api_repr() for item in log_entries]
+
+            return await blocking.run(_list_entries)
 
         except Exception as e:
             self.log.exception(f"Error fetching log entries: {str(e)}")
@@ -15,7 +15,8 @@
 import os
 from google.cloud import storage
 import google.oauth2.credentials as oauth2
-import aiofiles
+
+from dataproc_jupyter_plugin.commons import blocking, gcs, tasks
 
 
 class Client:
@@ -34,30 +35,29 @@ class Client:
 
     async def list_bucket(self):
         try:
-            cloud_storage_buckets = []
             credentials = oauth2.Credentials(self._access_token)
-            storage_client = storage.Client(credentials=credentials)
-            buckets = storage_client.list_buckets()
-            for bucket in buckets:
-                cloud_storage_buckets.append(bucket.name)
-            return cloud_storage_buckets
+
+            def _list_buckets():
+                storage_client = storage.Client(credentials=credentials)
+                return [bucket.name for bucket in storage_client.list_buckets()]
+
+            return await blocking.run(_list_buckets)
 
         except Exception as e:
             self.log.exception(f"Error fetching cloud storage buckets: {str(e)}")
             return {"Error fetching cloud storage buckets": str(e)}
 
-    async def download_output(self, bucket_name, file_name, job_run_id):
+    async def download_output(
+        self, bucket_name, file_name, job_run_id, destination_dir="."
+    ):
         try:
             credentials = oauth2.Credentials(self._access_token)
-            storage_client = storage.Client(credentials=credentials)
             blob_name = f"{job_run_id}/{file_name}"
-            bucket = storage_client.bucket(bucket_name)
-            blob = bucket.blob(blob_name)
             original_file_name = os.path.basename(blob_name)
-            destination_file_name = os.path.join(".", original_file_name)
-            async with aiofiles.open(destination_file_name, "wb") as f:
-                file_data = blob.download_as_bytes()
-                await f.write(file_data)
+            destination_file_name = os.path.join(destination_dir, original_file_name)
+            await gcs.download_to_file(
+                credentials, bucket_name, blob_name, destination_file_name
+            )
             self.log.info(
                 f"Output notebook file '{original_file_name}' downloaded successfully"
             )
@@ -65,3 +65,41 @@ class Client:
         except Exception as error:
             self.log.exception(f"Error downloading output notebook file: {str(error)}")
             return {"error": str(error)}
+
+    async def download_outputs(
+        self,
+        bucket_name,
+        outputs,
+        destination_dir=".",
+        concurrency=gcs.OUTPUT_DOWNLOAD_CONCURRENCY,
+    ):
+        """Downloads the output notebooks of many Vertex job runs concurrently.
+
+        `outputs` is a list of `(job_run_id, file_name)` pairs. Each output is
+        written to its own `job_run_id` subdirectory of `destination_dir`,
+        since runs of the same schedule share a file name. A result is yielded
+        for each output as soon as its download finishes.
+        """
+
+        async def _download(job_run_id, file_name):
+            job_run_dir = os.path.join(destination_dir, job_run_id)
+            os.makedirs(job_run_dir, exist_ok=True)
+            status = await self.download_output(
+                bucket_name, file_name, job_run_id, job_run_dir
+            )
+            result = {
+                "job_run_id": job_run_id,
+                "file_name": file_name,
+                "file_path": os.path.join(job_run_dir, os.path.basename(file_name)),
+            }
+            if status == 0:
+                result["status"] = status
+            else:
+                result.update(status)
+            return result
+
+        async for result in tasks.bounded_as_completed(
+            [_download(job_run_id, file_name) for job_run_id, file_name in outputs],
+            concurrency,
+        ):
+            yield result
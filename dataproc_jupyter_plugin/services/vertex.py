@@ -12,26 +12,43 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import aiohttp
-from cron_descriptor import get_description
+import asyncio
+import urllib.parse
 
 import google.oauth2.credentials as oauth2
 from google.cloud import storage
 
+from dataproc_jupyter_plugin import urls
+from dataproc_jupyter_plugin.commons import blocking, gcs
 from dataproc_jupyter_plugin.commons.constants import (
     CONTENT_TYPE,
+    STORAGE_SERVICE_DEFAULT_URL,
+    STORAGE_SERVICE_NAME,
     VERTEX_STORAGE_BUCKET,
 )
+from dataproc_jupyter_plugin.commons.cron import describe_cron
 from dataproc_jupyter_plugin.models.models import (
     DescribeVertexJob,
     DescribeBucketName,
     DescribeUpdateVertexJob,
 )
 
+# Maximum number of concurrent requests made when looking up the latest
+# execution job of each schedule.
+LATEST_EXECUTION_JOB_CONCURRENCY = 10
 
-class Client:
-    client_session = aiohttp.ClientSession()
+# Maximum number of concurrent requests made by bulk schedule operations.
+BULK_SCHEDULE_CONCURRENCY = 10
+
+# Page size used when following every page of notebook execution jobs.
+NOTEBOOK_EXECUTION_JOBS_PAGE_SIZE = 100
+
+# Buckets known to exist. Buckets are not deleted through the plugin, so a
+# positive result is kept for the process lifetime.
+_existing_buckets = set()
 
+
+class Client:
     def __init__(self, credentials, log, client_session):
         self.log = log
         if not (
@@ -56,12 +73,22 @@ class Client:
         try:
             if not bucket_name:
                 raise ValueError("Bucket name cannot be empty")
-            cloud_storage_buckets = []
-            storage_client = storage.Client()
-            buckets = storage_client.list_buckets()
-            for bucket in buckets:
-                cloud_storage_buckets.append(bucket.name)
-            return bucket_name in cloud_storage_buckets
+            if bucket_name in _existing_buckets:
+                return True
+            storage_url = await urls.gcp_service_url(
+                STORAGE_SERVICE_NAME, default_url=STORAGE_SERVICE_DEFAULT_URL
+            )
+            api_endpoint = f"{storage_url}b/{bucket_name}?fields=name"
+            async with self.client_session.get(
+                api_endpoint, headers=self.create_headers()
+            ) as response:
+                if response.status == 200:
+                    _existing_buckets.add(bucket_name)
+                    return True
+                elif response.status == 404:
+                    return False
+                else:
+                    raise Exception(f"{response.reason} {await response.text()}")
         except Exception as error:
             self.log.exception(f"Error checking Bucket: {error}")
             raise IOError(f"Error checking Bucket: {error}")
@@ -71,28 +98,34 @@ class Client:
             if not bucket_name:
                 raise ValueError("Bucket name cannot be empty")
             credentials = oauth2.Credentials(token=self._access_token)
-            storage_client = storage.Client(credentials=credentials)
-            bucket = storage_client.create_bucket(bucket_name)
+
+            def _create_bucket():
+                storage_client = storage.Client(credentials=credentials)
+                storage_client.create_bucket(bucket_name)
+
+            await blocking.run(_create_bucket)
+            _existing_buckets.add(bucket_name)
         except Exception as error:
             self.log.exception(f"Error in creating Bucket: {error}")
             raise IOError(f"Error in creating Bucket: {error}")
 
     async def upload_to_gcs(self, bucket_name, file_path, job_name):
         input_notebook = file_path.split("/")[-1]
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
+        blob_name = f"{job_name}/{input_notebook}"
+        json_blob_name = f"{job_name}/{job_name}.json"
 
         # uploading the input file
-        blob_name = f"{job_name}/{input_notebook}"
-        blob = bucket.blob(blob_name)
-        blob.upload_from_filename(file_path)
+        uploaded = await gcs.upload_file(bucket_name, blob_name, file_path)
 
         # uploading json file containing the input file path
-        json_blob_name = f"{job_name}/{job_name}.json"
-        json_blob = bucket.blob(json_blob_name)
-        json_blob.upload_from_string(f"gs://{bucket_name}/{blob_name}")
-
-        self.log.info(f"File {input_notebook} uploaded to gcs successfully")
+        await gcs.upload_string(
+            bucket_name, json_blob_name, f"gs://{bucket_name}/{blob_name}"
+        )
+
+        if uploaded:
+            self.log.info(f"File {input_notebook} uploaded to gcs successfully")
+        else:
+            self.log.info(f"File {input_notebook} is unchanged in gcs")
         return blob_name
 
     async def create_schedule(self, job, file_path, bucket_name):
@@ -231,190 +264,272 @@ class Client:
             self.log.exception(f"Error fetching ui config: {str(e)}")
             return {"Error fetching ui config": str(e)}
 
+    def _format_schedule(self, schedule):
+        return {
+            "name": schedule.get("name"),
+            "displayName": schedule.get("displayName"),
+            "schedule": describe_cron(
+                schedule.get("cron"), schedule.get("maxRunCount")
+            ),
+            "status": schedule.get("state"),
+            "createTime": schedule.get("createTime"),
+            "gcsNotebookSourceUri": schedule.get("createNotebookExecutionJobRequest")
+            .get("notebookExecutionJob")
+            .get("gcsNotebookSource"),
+            "lastScheduledRunResponse": schedule.get("lastScheduledRunResponse"),
+        }
+
+    async def _get_schedules_page(self, region_id, next_page_token=None):
+        if next_page_token:
+            api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/projects/{self.project_id}/locations/{region_id}/schedules?orderBy=createTime desc&pageToken={next_page_token}"
+        else:
+            api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/projects/{self.project_id}/locations/{region_id}/schedules?orderBy=createTime desc"
+
+        headers = self.create_headers()
+        async with self.client_session.get(api_endpoint, headers=headers) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                self.log.exception(
+                    f"Error listing schedules: {response.reason} {await response.text()}"
+                )
+                raise Exception(
+                    f"Error listing schedules: {response.reason} {await response.text()}"
+                )
+
     async def list_schedules(self, region_id, next_page_token=None):
         try:
             result = {}
-            if next_page_token:
-                api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/projects/{self.project_id}/locations/{region_id}/schedules?orderBy=createTime desc&pageToken={next_page_token}"
+            resp = await self._get_schedules_page(region_id, next_page_token)
+            if not resp:
+                return result
             else:
-                api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/projects/{self.project_id}/locations/{region_id}/schedules?orderBy=createTime desc"
-
-            headers = self.create_headers()
-            async with self.client_session.get(
-                api_endpoint, headers=headers
-            ) as response:
-                if response.status == 200:
-                    resp = await response.json()
-                    if not resp:
-                        return result
-                    else:
-                        schedule_list = []
-                        schedules = resp.get("schedules")
-                        for schedule in schedules:
-                            max_run_count = schedule.get("maxRunCount")
-                            cron = schedule.get("cron")
-                            cron_value = (
-                                cron.split(" ", 1)[1] if ("TZ" in cron) else cron
-                            )
-                            if max_run_count == "1" and cron_value == "* * * * *":
-                                schedule_value = "run once"
-                            else:
-                                schedule_value = get_description(cron)
-
-                            formatted_schedule = {
-                                "name": schedule.get("name"),
-                                "displayName": schedule.get("displayName"),
-                                "schedule": schedule_value,
-                                "status": schedule.get("state"),
-                                "createTime": schedule.get("createTime"),
-                                "gcsNotebookSourceUri": schedule.get(
-                                    "createNotebookExecutionJobRequest"
-                                )
-                                .get("notebookExecutionJob")
-                                .get("gcsNotebookSource"),
-                                "lastScheduledRunResponse": schedule.get(
-                                    "lastScheduledRunResponse"
-                                ),
-                            }
-                            schedule_list.append(formatted_schedule)
-                        resp["schedules"] = schedule_list
-                        result.update(resp)
-                        return result
-                else:
-                    self.log.exception(
-                        f"Error listing schedules: {response.reason} {await response.text()}"
-                    )
-                    raise Exception(
-                        f"Error listing schedules: {response.reason} {await response.text()}"
-                    )
+                schedules = resp.get("schedules")
+                resp["schedules"] = [
+                    self._format_schedule(schedule) for schedule in schedules
+                ]
+                result.update(resp)
+                return result
         except Exception as e:
             self.log.exception(f"Error fetching schedules: {str(e)}")
             return {"Error fetching schedules": str(e)}
 
-    async def pause_schedule(self, region_id, schedule_id):
+    async def get_latest_execution_job(self, region_id, schedule_id):
+        schedule_id = schedule_id.split("/")[-1]
+        resp = await self._get_notebook_execution_jobs_page(
+            region_id, f"schedule={schedule_id}", page_size=1
+        )
+        jobs = resp.get("notebookExecutionJobs") or []
+        return jobs[0] if jobs else None
+
+    async def _add_latest_execution_job(self, region_id, schedule, semaphore):
+        async with semaphore:
+            try:
+                schedule["latestExecutionJob"] = await self.get_latest_execution_job(
+                    region_id, schedule["name"]
+                )
+            except Exception as e:
+                self.log.exception(
+                    f"Error fetching latest execution job for {schedule['name']}: {str(e)}"
+                )
+                schedule["latestExecutionJob"] = {"error": str(e)}
+
+    async def list_all_schedules(
+        self,
+        region_id,
+        include_latest_job=False,
+        concurrency=LATEST_EXECUTION_JOB_CONCURRENCY,
+    ):
+        """Yields every page of formatted schedules as soon as it is ready.
+
+        Schedule pages are chained through `nextPageToken`, so they cannot be
+        requested in parallel. Instead the next page is fetched while the
+        latest execution jobs for the current page are being looked up.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        next_page = asyncio.ensure_future(self._get_schedules_page(region_id))
         try:
-            api_endpoint = (
-                f"https://{region_id}-aiplatform.googleapis.com/v1/{schedule_id}:pause"
-            )
-
-            headers = self.create_headers()
-            async with self.client_session.post(
-                api_endpoint, headers=headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 204:
-                    return {"message": "Schedule paused successfully"}
-                else:
-                    self.log.exception(
-                        f"Error pausing the schedule: {response.reason} {await response.text()}"
+            while next_page is not None:
+                resp = await next_page or {}
+                next_page_token = resp.get("nextPageToken")
+                next_page = None
+                if next_page_token:
+                    next_page = asyncio.ensure_future(
+                        self._get_schedules_page(region_id, next_page_token)
                     )
-                    raise Exception(
-                        f"Error pausing the schedule: {response.reason} {await response.text()}"
+                schedules = [
+                    self._format_schedule(schedule)
+                    for schedule in resp.get("schedules", [])
+                ]
+                if include_latest_job:
+                    await asyncio.gather(
+                        *[
+                            self._add_latest_execution_job(
+                                region_id, schedule, semaphore
+                            )
+                            for schedule in schedules
+                        ]
                     )
+                yield schedules
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _post_schedule_action(
+        self, region_id, schedule_id, verb, description, message
+    ):
+        api_endpoint = (
+            f"https://{region_id}-aiplatform.googleapis.com/v1/{schedule_id}:{verb}"
+        )
+
+        headers = self.create_headers()
+        async with self.client_session.post(api_endpoint, headers=headers) as response:
+            if response.status == 200:
+                return await response.json()
+            elif response.status == 204:
+                return {"message": message}
+            else:
+                raise Exception(
+                    f"Error {description} the schedule: {response.reason} {await response.text()}"
+                )
+
+    async def _pause_schedule(self, region_id, schedule_id):
+        return await self._post_schedule_action(
+            region_id, schedule_id, "pause", "pausing", "Schedule paused successfully"
+        )
+
+    async def _resume_schedule(self, region_id, schedule_id):
+        return await self._post_schedule_action(
+            region_id,
+            schedule_id,
+            "resume",
+            "resuming",
+            "Schedule resumed successfully",
+        )
+
+    async def _delete_schedule(self, region_id, schedule_id):
+        api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/{schedule_id}"
+
+        headers = self.create_headers()
+        async with self.client_session.delete(
+            api_endpoint, headers=headers
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            elif response.status == 204:
+                return {"message": "Schedule deleted successfully"}
+            else:
+                raise Exception(
+                    f"Error deleting the schedule: {response.reason} {await response.text()}"
+                )
+
+    async def _get_schedule(self, region_id, schedule_id):
+        api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/{schedule_id}"
+
+        headers = self.create_headers()
+        async with self.client_session.get(api_endpoint, headers=headers) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                raise Exception(
+                    f"Error getting the schedule: {response.reason} {await response.text()}"
+                )
+
+    async def _trigger_schedule(self, region_id, schedule_id):
+        data = await self._get_schedule(region_id, schedule_id)
+        api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/projects/{self.project_id}/locations/{region_id}/notebookExecutionJobs"
+
+        headers = self.create_headers()
+        payload = data.get("createNotebookExecutionJobRequest").get(
+            "notebookExecutionJob"
+        )
+        payload["scheduleResourceName"] = data.get("name")
+        async with self.client_session.post(
+            api_endpoint, headers=headers, json=payload
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                raise Exception(
+                    f"Error triggering the schedule: {response.reason} {await response.text()}"
+                )
+
+    async def pause_schedule(self, region_id, schedule_id):
+        try:
+            return await self._pause_schedule(region_id, schedule_id)
         except Exception as e:
             self.log.exception(f"Error pausing schedule: {str(e)}")
             return {"Error pausing schedule": str(e)}
 
     async def resume_schedule(self, region_id, schedule_id):
         try:
-            api_endpoint = (
-                f"https://{region_id}-aiplatform.googleapis.com/v1/{schedule_id}:resume"
-            )
-
-            headers = self.create_headers()
-            async with self.client_session.post(
-                api_endpoint, headers=headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 204:
-                    return {"message": "Schedule resumed successfully"}
-                else:
-                    self.log.exception(
-                        f"Error resuming the schedule: {response.reason} {await response.text()}"
-                    )
-                    raise Exception(
-                        f"Error resuming the schedule: {response.reason} {await response.text()}"
-                    )
+            return await self._resume_schedule(region_id, schedule_id)
         except Exception as e:
             self.log.exception(f"Error resuming schedule: {str(e)}")
             return {"Error resuming schedule": str(e)}
 
     async def delete_schedule(self, region_id, schedule_id):
         try:
-            api_endpoint = (
-                f"https://{region_id}-aiplatform.googleapis.com/v1/{schedule_id}"
-            )
-
-            headers = self.create_headers()
-            async with self.client_session.delete(
-                api_endpoint, headers=headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 204:
-                    return {"message": "Schedule deleted successfully"}
-                else:
-                    self.log.exception(
-                        f"Error deleting the schedule: {response.reason} {await response.text()}"
-                    )
-                    raise Exception(
-                        f"Error deleting the schedule: {response.reason} {await response.text()}"
-                    )
+            return await self._delete_schedule(region_id, schedule_id)
         except Exception as e:
             self.log.exception(f"Error deleting schedule: {str(e)}")
             return {"Error deleting schedule": str(e)}
 
     async def get_schedule(self, region_id, schedule_id):
         try:
-            api_endpoint = (
-                f"https://{region_id}-aiplatform.googleapis.com/v1/{schedule_id}"
-            )
-
-            headers = self.create_headers()
-            async with self.client_session.get(
-                api_endpoint, headers=headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    self.log.exception(
-                        f"Error getting the schedule: {response.reason} {await response.text()}"
-                    )
-                    raise Exception(
-                        f"Error getting the schedule: {response.reason} {await response.text()}"
-                    )
+            return await self._get_schedule(region_id, schedule_id)
         except Exception as e:
             self.log.exception(f"Error getting schedule: {str(e)}")
             return {"Error getting schedule": str(e)}
 
     async def trigger_schedule(self, region_id, schedule_id):
         try:
-            data = await self.get_schedule(region_id, schedule_id)
-            api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/projects/{self.project_id}/locations/{region_id}/notebookExecutionJobs"
-
-            headers = self.create_headers()
-            payload = data.get("createNotebookExecutionJobRequest").get(
-                "notebookExecutionJob"
-            )
-            payload["scheduleResourceName"] = data.get("name")
-            async with self.client_session.post(
-                api_endpoint, headers=headers, json=payload
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    self.log.exception(
-                        f"Error triggering the schedule: {response.reason} {await response.text()}"
-                    )
-                    raise Exception(
-                        f"Error triggering the schedule: {response.reason} {await response.text()}"
-                    )
+            return await self._trigger_schedule(region_id, schedule_id)
         except Exception as e:
             self.log.exception(f"Error triggering schedule: {str(e)}")
             return {"Error triggering schedule": str(e)}
 
+    async def bulk_update_schedules(
+        self,
+        region_id,
+        schedule_ids,
+        action,
+        concurrency=BULK_SCHEDULE_CONCURRENCY,
+    ):
+        """Pauses, resumes, deletes or triggers many schedules at once.
+
+        The operations run concurrently, and a schedule that is listed more
+        than once is only acted on once. Triggering fetches each schedule and
+        reuses that payload for the new execution job. Returns a result per
+        schedule, in the order of `schedule_ids`, with either the API
+        `response` or an `error`.
+        """
+        operations = {
+            "pause": self._pause_schedule,
+            "resume": self._resume_schedule,
+            "delete": self._delete_schedule,
+            "trigger": self._trigger_schedule,
+        }
+        if action not in operations:
+            raise ValueError(f"Invalid bulk action: {action}")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _apply(schedule_id):
+            try:
+                async with semaphore:
+                    resp = await operations[action](region_id, schedule_id)
+                return {"schedule_id": schedule_id, "response": resp}
+            except Exception as e:
+                self.log.exception(f"Error running {action} on {schedule_id}: {str(e)}")
+                return {"schedule_id": schedule_id, "error": str(e)}
+
+        unique_ids = list(dict.fromkeys(schedule_ids))
+        results = await asyncio.gather(
+            *[_apply(schedule_id) for schedule_id in unique_ids]
+        )
+        results = dict(zip(unique_ids, results))
+        return [dict(results[schedule_id]) for schedule_id in schedule_ids]
+
     async def update_schedule(self, region_id, schedule_id, input_data):
         try:
             data = DescribeUpdateVertexJob(**input_data)
@@ -502,37 +617,81 @@ class Client:
             self.log.exception(f"Error updating schedule: {str(e)}")
             return {"Error updating schedule": str(e)}
 
-    async def list_notebook_execution_jobs(self, region_id, schedule_id, start_date):
+    async def _get_notebook_execution_jobs_page(
+        self, region_id, filter_query, page_size=None, page_token=None
+    ):
+        query = {"filter": filter_query, "orderBy": "createTime desc"}
+        if page_size:
+            query["pageSize"] = page_size
+        if page_token:
+            query["pageToken"] = page_token
+        api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/projects/{self.project_id}/locations/{region_id}/notebookExecutionJobs?{urllib.parse.urlencode(query)}"
+
+        headers = self.create_headers()
+        async with self.client_session.get(api_endpoint, headers=headers) as response:
+            if response.status == 200:
+                return await response.json() or {}
+            else:
+                self.log.exception(
+                    f"Error fetching notebook execution jobs: {response.reason} {await response.text()}"
+                )
+                raise Exception(
+                    f"Error fetching notebook execution jobs: {response.reason} {await response.text()}"
+                )
+
+    def _create_time_range(self, start_date, end_date=None):
+        if end_date:
+            return start_date, end_date
+        # Without an explicit end date, match every job created in the same
+        # month as the start date (which is in zulu format, e.g.
+        # 2011-08-12T20:17:46.384Z).
+        year, month = (int(part) for part in start_date.split("-")[:2])
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return (
+            f"{year:04d}-{month:02d}-01T00:00:00Z",
+            f"{next_year:04d}-{next_month:02d}-01T00:00:00Z",
+        )
+
+    async def list_notebook_execution_jobs(
+        self,
+        region_id,
+        schedule_id,
+        start_date,
+        end_date=None,
+        page_size=None,
+        page_token=None,
+    ):
+        """Lists the execution jobs of a schedule created in a time range.
+
+        The create time range is applied by the API. Without a `page_size`
+        every page is fetched and a list of jobs is returned. With one, a
+        single page is returned as a dictionary holding the jobs and the
+        `nextPageToken` cursor for the following page.
+        """
         try:
-            execution_jobs = []
-            api_endpoint = f"https://{region_id}-aiplatform.googleapis.com/v1/projects/{self.project_id}/locations/{region_id}/notebookExecutionJobs?filter=schedule={schedule_id}&orderBy=createTime desc"
+            range_start, range_end = self._create_time_range(start_date, end_date)
+            filter_query = f'schedule={schedule_id} AND createTime>="{range_start}" AND createTime<"{range_end}"'
+            if page_size:
+                resp = await self._get_notebook_execution_jobs_page(
+                    region_id, filter_query, page_size, page_token
+                )
+                return {
+                    "notebookExecutionJobs": resp.get("notebookExecutionJobs", []),
+                    "nextPageToken": resp.get("nextPageToken"),
+                }
 
-            headers = self.create_headers()
-            async with self.client_session.get(
-                api_endpoint, headers=headers
-            ) as response:
-                if response.status == 200:
-                    resp = await response.json()
-                    if not resp:
-                        return execution_jobs
-                    else:
-                        jobs = resp.get("notebookExecutionJobs")
-                        for job in jobs:
-                            # getting only the jobs whose create time is equal to start date
-                            # splitting it in order to get only the date part from the values which is in zulu format (2011-08-12T20:17:46.384Z)
-                            if (
-                                start_date.rsplit("-", 1)[0]
-                                == job.get("createTime").rsplit("-", 1)[0]
-                            ):
-                                execution_jobs.append(job)
-                        return execution_jobs
-                else:
-                    self.log.exception(
-                        f"Error fetching notebook execution jobs: {response.reason} {await response.text()}"
-                    )
-                    raise Exception(
-                        f"Error fetching notebook execution jobs: {response.reason} {await response.text()}"
-                    )
+            execution_jobs = []
+            while True:
+                resp = await self._get_notebook_execution_jobs_page(
+                    region_id,
+                    filter_query,
+                    NOTEBOOK_EXECUTION_JOBS_PAGE_SIZE,
+                    page_token,
+                )
+                execution_jobs.extend(resp.get("notebookExecutionJobs", []))
+                page_token = resp.get("nextPageToken")
+                if not page_token:
+                    return execution_jobs
         except Exception as e:
             self.log.exception(
                 f"Error fetching list of notebook execution jobs: {str(e)}"
@@ -12,10 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
+import json
+
 import aiohttp
+import google_crc32c
 from google.cloud import jupyter_config
 
-from dataproc_jupyter_plugin import credentials
+from dataproc_jupyter_plugin import credentials, urls
 
 
 async def mock_credentials():
@@ -34,10 +38,11 @@ async def mock_config(field_name):
 
 
 class MockResponse:
-    def __init__(self, json, status=200, text=None):
+    def __init__(self, json, status=200, text=None, reason=None):
         self._json = json
         self._text = text
         self.status = status
+        self.reason = reason
 
     async def __aenter__(self):
         return self
@@ -51,14 +56,23 @@ class MockResponse:
     async def text(self, encoding=None):
         return self._text or json.dumps(self._json)
 
+    async def read(self):
+        return (await self.text()).encode()
+
 
 class MockClientSession:
+    def __init__(self, *args, **kwargs):
+        return
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, *args, **kwargs):
         return
 
+    async def close(self):
+        return
+
     def get(self, api_endpoint, headers=None):
         return MockResponse(
             {
@@ -81,7 +95,28 @@ class MockClientSession:
         )
 
 
+class MockBlob:
+    def __init__(self, content, generation=1):
+        self.content = content
+        self.generation = generation
+        self.size = None
+        self.crc32c = None
+        self.md5_hash = None
+        self.ranges = []
+
+    def reload(self):
+        self.size = len(self.content)
+        self.crc32c = base64.b64encode(
+            google_crc32c.Checksum(self.content).digest()
+        ).decode()
+
+    def download_as_bytes(self, start=None, end=None, **kwargs):
+        self.ranges.append((start, end))
+        return self.content[start : end + 1]
+
+
 def patch_mocks(monkeypatch):
     monkeypatch.setattr(credentials, "get_cached", mock_credentials)
     monkeypatch.setattr(jupyter_config, "async_get_gcloud_config", mock_config)
     monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
+    urls.invalidate()
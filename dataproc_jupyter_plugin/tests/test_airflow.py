@@ -13,18 +13,24 @@
 # limitations under the License.
 
 import json
+import logging
 import subprocess
+import urllib.parse
 from unittest.mock import AsyncMock, MagicMock
 
 import aiohttp
+import cachetools
 
 from dataproc_jupyter_plugin.tests import mocks
 
 import pytest
+import tornado
+from google.api_core.exceptions import Forbidden
 from google.cloud import jupyter_config
 
 from dataproc_jupyter_plugin import credentials
-from dataproc_jupyter_plugin.services import airflow
+from dataproc_jupyter_plugin.models.models import ComposerEnvironment
+from dataproc_jupyter_plugin.services import airflow, composer
 
 
 async def mock_get_airflow_uri(self, composer_name):
@@ -33,6 +39,7 @@ async def mock_get_airflow_uri(self, composer_name):
 
 async def test_list_jobs(monkeypatch, jp_fetch):
     mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(airflow, "_dag_lists", cachetools.TTLCache(8, 60))
 
     monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
     mock_composer = "mock-url"
@@ -44,11 +51,96 @@ async def test_list_jobs(monkeypatch, jp_fetch):
 
     assert response.code == 200
     payload = json.loads(response.body)
-    assert (
-        payload[0]["api_endpoint"]
-        == "https://mock_airflow_uri/api/v1/dags?tags=dataproc_jupyter_plugin"
+    assert payload == [{"dags": [], "total_entries": 0}, "mock_bucket"]
+
+
+class MockPagingSession(mocks.MockClientSession):
+    """Serves `items` from an Airflow list API that pages with limit/offset."""
+
+    def __init__(self, items_key, items):
+        self.items_key = items_key
+        self.items = items
+        self.queries = []
+
+    def get(self, api_endpoint, headers=None):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(api_endpoint).query)
+        self.queries.append(query)
+        offset = int(query["offset"][0])
+        limit = int(query["limit"][0])
+        return mocks.MockResponse(
+            {
+                self.items_key: self.items[offset : offset + limit],
+                "total_entries": len(self.items),
+            }
+        )
+
+
+async def test_list_jobs_pages(monkeypatch):
+    monkeypatch.setattr(airflow, "_dag_lists", cachetools.TTLCache(8, 60))
+    monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
+    session = MockPagingSession("dags", [{"dag_id": f"dag-{i}"} for i in range(250)])
+    client = airflow.Client(
+        {"access_token": "t", "project_id": "p", "region_id": "r"},
+        logging.getLogger(),
+        session,
     )
-    assert payload[0]["headers"]["Authorization"] == f"Bearer mock-token"
+
+    resp, bucket = await client.list_jobs("composer", dag_id_pattern="abc", paused=True)
+
+    assert bucket == "mock_bucket"
+    assert resp["total_entries"] == 250
+    assert [dag["dag_id"] for dag in resp["dags"]] == [f"dag-{i}" for i in range(250)]
+    assert sorted(int(query["offset"][0]) for query in session.queries) == [
+        0,
+        100,
+        200,
+    ]
+    for query in session.queries:
+        assert query["tags"] == ["dataproc_jupyter_plugin"]
+        assert query["dag_id_pattern"] == ["abc"]
+        assert query["paused"] == ["true"]
+
+    # Repeated listings are served from the cache until the DAGs change.
+    await client.list_jobs("composer", dag_id_pattern="abc", paused=True)
+    assert len(session.queries) == 3
+    client.forget_dag_list("composer")
+    await client.list_jobs("composer", dag_id_pattern="abc", paused=True)
+    assert len(session.queries) == 6
+
+
+async def test_job_inventory(monkeypatch, jp_fetch):
+    async def mock_list_environments(self):
+        return [
+            ComposerEnvironment(
+                name=name,
+                label=name,
+                description=f"Environment: {name}",
+                file_extensions=["ipynb"],
+                metadata={"path": name},
+            )
+            for name in ["env-a", "env-b", "env-broken"]
+        ]
+
+    async def mock_list_jobs(self, composer_name):
+        if composer_name == "env-broken":
+            return {"error": "mock error"}
+        dags = [{"dag_id": "job-2"}, {"dag_id": "job-1"}]
+        return {"dags": dags, "total_entries": 2}, f"{composer_name}-bucket"
+
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(composer.Client, "list_environments", mock_list_environments)
+    monkeypatch.setattr(airflow.Client, "list_jobs", mock_list_jobs)
+    response = await jp_fetch("dataproc-plugin", "jobInventory")
+
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert payload["jobs"] == [
+        {"dag_id": "job-1", "composer": "env-a", "bucket": "env-a-bucket"},
+        {"dag_id": "job-1", "composer": "env-b", "bucket": "env-b-bucket"},
+        {"dag_id": "job-2", "composer": "env-a", "bucket": "env-a-bucket"},
+        {"dag_id": "job-2", "composer": "env-b", "bucket": "env-b-bucket"},
+    ]
+    assert payload["errors"] == {"env-broken": "mock error"}
 
 
 async def test_list_dag_with_missing_argument(monkeypatch, jp_fetch):
@@ -116,12 +208,18 @@ async def test_list_dag_with_invalid_credentials(monkeypatch, jp_fetch):
 
 
 class MockClientSession:
+    def __init__(self, *args, **kwargs):
+        return
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, *args, **kwargs):
         return
 
+    async def close(self):
+        return
+
     def patch(self, api_endpoint, json, headers=None):
         if json["is_paused"] is False:
             return mocks.MockResponse({})
@@ -161,6 +259,90 @@ async def test_update_job(monkeypatch, jp_fetch):
     assert payload["status"] == 0
 
 
+async def test_bulk_update_jobs(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
+    monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
+
+    async def bulk_action(action, dag_ids):
+        response = await jp_fetch(
+            "dataproc-plugin",
+            "dagBulkAction",
+            params={"composer": "composer"},
+            method="POST",
+            body=json.dumps({"action": action, "dag_ids": dag_ids}),
+        )
+        assert response.code == 200
+        return json.loads(response.body)
+
+    assert await bulk_action("resume", ["dag_1", "dag_2"]) == [
+        {"dag_id": "dag_1", "status": 0},
+        {"dag_id": "dag_2", "status": 0},
+    ]
+    # The mock session rejects pausing.
+    payload = await bulk_action("pause", ["dag_1"])
+    assert payload[0]["dag_id"] == "dag_1"
+    assert payload[0]["error"].startswith("Error running pause on DAG")
+    assert await bulk_action("rename", ["dag_1"]) == {
+        "error": "Invalid bulk action: rename"
+    }
+    assert await bulk_action("pause", ["dag/1"]) == {"error": "Invalid DAG ID: dag/1"}
+
+
+class MockDagBucket:
+    def __init__(self, failing_blob_name):
+        self.failing_blob_name = failing_blob_name
+        self.deleted = []
+
+    def blob(self, blob_name):
+        blob = MagicMock()
+        blob.name = blob_name
+
+        def _delete():
+            if blob_name == self.failing_blob_name:
+                raise Forbidden("mock forbidden")
+            self.deleted.append(blob_name)
+
+        blob.delete.side_effect = _delete
+        return blob
+
+    def delete_blobs(self, blobs, on_error=None):
+        for blob in blobs:
+            self.deleted.append(blob.name)
+
+
+async def test_bulk_delete_jobs(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
+    monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
+    mock_bucket = MockDagBucket("dags/dag_dag_2.py")
+    mock_storage_client = MagicMock()
+    mock_storage_client.bucket.return_value = mock_bucket
+    monkeypatch.setattr(airflow.storage, "Client", lambda: mock_storage_client)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "dagBulkAction",
+        params={"composer": "composer"},
+        method="POST",
+        body=json.dumps({"action": "delete", "dag_ids": ["dag_1", "dag_2", "dag_3"]}),
+    )
+
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert payload[0] == {"dag_id": "dag_1", "status": 0}
+    assert payload[1]["dag_id"] == "dag_2"
+    assert payload[1]["error"].startswith("Error deleting DAG file: 403")
+    assert payload[2] == {"dag_id": "dag_3", "status": 0}
+    mock_storage_client.bucket.assert_called_once_with("mock_bucket")
+    assert sorted(mock_bucket.deleted) == [
+        "dags/dag_dag_1.json",
+        "dags/dag_dag_1.py",
+        "dags/dag_dag_3.json",
+        "dags/dag_dag_3.py",
+    ]
+
+
 async def test_list_dag_run(monkeypatch, jp_fetch):
     mocks.patch_mocks(monkeypatch)
     monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
@@ -191,6 +373,76 @@ async def test_list_dag_run(monkeypatch, jp_fetch):
     assert payload["headers"]["Authorization"] == f"Bearer mock-token"
 
 
+async def test_dag_run_history(monkeypatch):
+    monkeypatch.setattr(airflow, "_closed_dag_run_histories", cachetools.LRUCache(8))
+    monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
+    dag_runs = [
+        {
+            "dag_run_id": f"run-{i}",
+            "execution_date": f"2024-01-0{1 + i % 2}T00:00:00+00:00",
+            "start_date": f"2024-01-0{1 + i % 2}T00:01:00+00:00",
+            "state": "failed" if i % 3 == 0 else "success",
+        }
+        for i in range(150)
+    ]
+    session = MockPagingSession("dag_runs", dag_runs)
+    client = airflow.Client(
+        {"access_token": "t", "project_id": "p", "region_id": "r"},
+        logging.getLogger(),
+        session,
+    )
+
+    resp = await client.dag_run_history(
+        "composer", "mock_dag_id", "2024-01-01T00:00:00.000Z", "2024-01-31T00:00:00Z"
+    )
+
+    assert resp["total_entries"] == 150
+    assert [run["dag_run_id"] for run in resp["dag_runs"]] == [
+        f"run-{i}" for i in range(150)
+    ]
+    assert resp["days"] == {
+        "2024-01-01": {"failed": 25, "success": 50},
+        "2024-01-02": {"failed": 25, "success": 50},
+    }
+    assert resp["states"] == {"failed": 50, "success": 100}
+    assert sorted(int(query["offset"][0]) for query in session.queries) == [0, 100]
+    assert session.queries[0]["execution_date_gte"] == ["2024-01-01T00:00:00.000Z"]
+
+    # The range is in the past and all of its runs have finished.
+    await client.dag_run_history(
+        "composer", "mock_dag_id", "2024-01-01T00:00:00.000Z", "2024-01-31T00:00:00Z"
+    )
+    assert len(session.queries) == 2
+
+
+async def test_dag_run_history_open_range(monkeypatch):
+    monkeypatch.setattr(airflow, "_closed_dag_run_histories", cachetools.LRUCache(8))
+    monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
+    session = MockPagingSession(
+        "dag_runs",
+        [
+            {
+                "dag_run_id": "run",
+                "execution_date": "2024-01-01T00:00:00+00:00",
+                "start_date": None,
+                "state": "queued",
+            }
+        ],
+    )
+    client = airflow.Client(
+        {"access_token": "t", "project_id": "p", "region_id": "r"},
+        logging.getLogger(),
+        session,
+    )
+
+    for _ in range(2):
+        resp = await client.dag_run_history(
+            "composer", "mock_dag_id", "2024-01-01T00:00:00Z", "2024-01-31T00:00:00Z"
+        )
+    assert resp["days"] == {"2024-01-01": {"queued": 1}}
+    assert len(session.queries) == 2
+
+
 async def test_list_dag_run_task_logs(monkeypatch, jp_fetch):
     mocks.patch_mocks(monkeypatch)
     monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
@@ -217,6 +469,122 @@ async def test_list_dag_run_task_logs(monkeypatch, jp_fetch):
     assert payload["content"] == "mock log content"
 
 
+class MockTaskLogSession(MockClientSession):
+    def __init__(self, *args, **kwargs):
+        self.log_lines = ["line 1\n", "line 2\n", "", "line 3\n", ""]
+        self.states = ["running", "running", "running", "success"]
+        self.tokens = []
+
+    def get(self, api_endpoint, headers=None):
+        url = urllib.parse.urlparse(api_endpoint)
+        if not url.path.endswith("/logs/1"):
+            return mocks.MockResponse({"state": self.states.pop(0)})
+        query = urllib.parse.parse_qs(url.query)
+        assert query["full_content"] == ["false"]
+        assert headers["Accept"] == "application/json"
+        token = query.get("token", ["0"])[0]
+        self.tokens.append(token)
+        return mocks.MockResponse(
+            {
+                "content": self.log_lines[int(token)],
+                "continuation_token": str(int(token) + 1),
+            }
+        )
+
+
+async def test_stream_dag_run_task_logs(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockTaskLogSession)
+    monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
+    monkeypatch.setattr(airflow, "TASK_LOG_POLL_INTERVAL", 0)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "dagRunTaskLogsStream",
+        params={
+            "composer": "mock-url",
+            "dag_id": "mock_dag_id",
+            "dag_run_id": "256",
+            "task_id": "mock_task_id",
+            "task_try_number": "1",
+            "follow": "true",
+        },
+        headers={"Last-Event-ID": "1"},
+    )
+
+    assert response.code == 200
+    assert response.headers["Content-Type"] == "text/event-stream"
+    assert response.body.decode() == (
+        'id: 2\ndata: "line 2\\n"\n\n'
+        'id: 4\ndata: "line 3\\n"\n\n'
+        "event: end\ndata: {}\n\n"
+    )
+
+
+async def test_dag_run_details(monkeypatch, jp_fetch):
+    async def mock_list_dag_run_task(self, composer_name, dag_id, dag_run_id):
+        return {
+            "task_instances": [
+                {"task_id": "create_batch", "try_number": 2},
+                {"task_id": "broken", "try_number": 1},
+                {"task_id": "not_started", "try_number": 0},
+            ],
+            "total_entries": 3,
+        }
+
+    async def mock_list_dag_run_task_logs(
+        self, composer_name, dag_id, dag_run_id, task_id, task_try_number
+    ):
+        if task_id == "broken":
+            return {"error": "mock error"}
+        return {"content": f"first line\nsecond line\ntry {task_try_number}\n"}
+
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(airflow.Client, "list_dag_run_task", mock_list_dag_run_task)
+    monkeypatch.setattr(
+        airflow.Client, "list_dag_run_task_logs", mock_list_dag_run_task_logs
+    )
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "dagRunDetails",
+        params={
+            "composer": "mock-url",
+            "dag_id": "mock_dag_id",
+            "dag_run_id": "256",
+            "tail_size": "20",
+        },
+    )
+
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert [task["log"] for task in payload["task_instances"]] == [
+        {"content": "second line\ntry 2\n", "truncated": True},
+        {"error": "mock error"},
+        None,
+    ]
+
+
+@pytest.mark.parametrize("tail_size", ["0", "-5", "ten"])
+async def test_dag_run_details_invalid_tail_size(monkeypatch, jp_fetch, tail_size):
+    mocks.patch_mocks(monkeypatch)
+    with pytest.raises(tornado.httpclient.HTTPClientError) as e:
+        await jp_fetch(
+            "dataproc-plugin",
+            "dagRunDetails",
+            params={
+                "composer": "mock-url",
+                "dag_id": "mock_dag_id",
+                "dag_run_id": "256",
+                "tail_size": tail_size,
+            },
+        )
+
+    assert e.value.code == 400
+    assert json.loads(e.value.response.body) == {
+        "error": f"Invalid tail_size: {tail_size}"
+    }
+
+
 async def test_list_dag_run_task(monkeypatch, jp_fetch):
     mocks.patch_mocks(monkeypatch)
     monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
@@ -255,8 +623,60 @@ async def test_edit_jobs(monkeypatch, jp_fetch):
     assert response.code == 200
 
 
+class MockDagFileSession(mocks.MockClientSession):
+    def __init__(self, *args, **kwargs):
+        self.requested_files = []
+
+    def get(self, api_endpoint, headers=None):
+        file_path = urllib.parse.unquote(api_endpoint.split("/o/")[1].split("?")[0])
+        self.requested_files.append(file_path)
+        if file_path == "dags/dag_new_job.json":
+            return mocks.MockResponse(
+                {"version": 1, "input_filename": "gs://mock-bucket/new.ipynb"}
+            )
+        if file_path == "dags/dag_legacy_job.py":
+            return mocks.MockResponse(
+                None, text="input_notebook = 'gs://mock-bucket/legacy.ipynb'\n"
+            )
+        return mocks.MockResponse({}, status=404)
+
+
+async def test_edit_jobs_metadata(monkeypatch):
+    mocks.patch_mocks(monkeypatch)
+    client_session = MockDagFileSession()
+    client = airflow.Client(
+        await mocks.mock_credentials(), logging.getLogger(__name__), client_session
+    )
+
+    payload = await client.edit_jobs("new_job", "mock-bucket")
+    assert payload == {"input_filename": "gs://mock-bucket/new.ipynb"}
+    assert client_session.requested_files == ["dags/dag_new_job.json"]
+
+
+async def test_edit_jobs_legacy(monkeypatch):
+    mocks.patch_mocks(monkeypatch)
+    client_session = MockDagFileSession()
+    client = airflow.Client(
+        await mocks.mock_credentials(), logging.getLogger(__name__), client_session
+    )
+
+    async def mock_edit_legacy_job(dag_id, bucket_name):
+        file_content = (await client.get_dag_file(dag_id, bucket_name)).decode()
+        return {"input_filename": file_content.split("'")[1]}
+
+    monkeypatch.setattr(client, "_edit_legacy_job", mock_edit_legacy_job)
+
+    payload = await client.edit_jobs("legacy_job", "mock-bucket")
+    assert payload == {"input_filename": "gs://mock-bucket/legacy.ipynb"}
+    assert client_session.requested_files == [
+        "dags/dag_legacy_job.json",
+        "dags/dag_legacy_job.py",
+    ]
+
+
 async def test_list_import_errors(monkeypatch, jp_fetch):
     mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(airflow, "_import_errors", cachetools.TTLCache(8, 60))
     monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
 
     mock_composer = "mock-composer"
@@ -267,11 +687,67 @@ async def test_list_import_errors(monkeypatch, jp_fetch):
     )
     assert response.code == 200
     payload = json.loads(response.body)
-    assert (
-        payload["api_endpoint"]
-        == f"https://mock_airflow_uri/api/v1/importErrors?order_by=-import_error_id"
+    assert payload["import_errors"] == []
+    assert payload["total_entries"] == 0
+    assert payload["changed"]
+
+
+async def test_list_import_errors_unchanged(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(airflow, "_import_errors", cachetools.TTLCache(8, 60))
+    session = MockPagingSession(
+        "import_errors",
+        [
+            {"import_error_id": i, "filename": f"dags/dag_{i}.py", "stack_trace": "..."}
+            for i in range(150, 0, -1)
+        ],
     )
-    assert payload["headers"]["Authorization"] == f"Bearer mock-token"
+    monkeypatch.setattr(aiohttp, "ClientSession", lambda *args, **kwargs: session)
+    monkeypatch.setattr(airflow.Client, "get_airflow_uri", mock_get_airflow_uri)
+    params = {"composer": "mock-composer", "limit": "10", "offset": "5"}
+
+    response = await jp_fetch("dataproc-plugin", "importErrorsList", params=params)
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert payload["total_entries"] == 150
+    assert [error["import_error_id"] for error in payload["import_errors"]] == list(
+        range(145, 135, -1)
+    )
+    assert sorted(int(query["offset"][0]) for query in session.queries) == [0, 100]
+    etag = response.headers["Etag"]
+
+    with pytest.raises(tornado.httpclient.HTTPClientError) as e:
+        await jp_fetch(
+            "dataproc-plugin",
+            "importErrorsList",
+            params=params,
+            headers={"If-None-Match": etag},
+        )
+    assert e.value.code == 304
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "importErrorsList",
+        params=dict(params, since=payload["fingerprint"]),
+    )
+    payload = json.loads(response.body)
+    assert payload["import_errors"] == []
+    assert not payload["changed"]
+    assert len(session.queries) == 2
+
+
+@pytest.mark.parametrize("name,value", [("limit", "-1"), ("offset", "-5")])
+async def test_list_import_errors_negative_paging(monkeypatch, jp_fetch, name, value):
+    mocks.patch_mocks(monkeypatch)
+    with pytest.raises(tornado.httpclient.HTTPClientError) as e:
+        await jp_fetch(
+            "dataproc-plugin",
+            "importErrorsList",
+            params={"composer": "mock-composer", name: value},
+        )
+
+    assert e.value.code == 400
+    assert json.loads(e.value.response.body) == {"error": f"Invalid {name}: {value}"}
 
 
 async def test_dag_trigger(monkeypatch, jp_fetch):
@@ -340,3 +816,60 @@ async def test_invalid_dag_id(monkeypatch, jp_fetch):
     assert "results" not in payload
     assert "error" in payload
     assert "Invalid DAG ID" in payload["error"]
+
+
+class MockComposerSession:
+    def __init__(self, status=200):
+        self.status = status
+        self.calls = 0
+
+    def get(self, api_endpoint, headers=None):
+        self.calls += 1
+        response = mocks.MockResponse(
+            {
+                "config": {"airflowUri": "https://mock_airflow_uri"},
+                "storageConfig": {"bucket": "mock_bucket"},
+            },
+            status=self.status,
+            text="mock error",
+        )
+        response.reason = "mock reason"
+        return response
+
+
+async def test_get_airflow_uri_is_cached(monkeypatch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(airflow, "_environments", cachetools.TTLCache(8, 60))
+    client_session = MockComposerSession()
+    client = airflow.Client(
+        await mocks.mock_credentials(), logging.getLogger(__name__), client_session
+    )
+
+    assert await client.get_airflow_uri("composer") == (
+        "https://mock_airflow_uri",
+        "mock_bucket",
+    )
+    assert await client.get_airflow_uri("composer") == (
+        "https://mock_airflow_uri",
+        "mock_bucket",
+    )
+    assert client_session.calls == 1
+
+    client.forget_airflow_uri("composer")
+    await client.get_airflow_uri("composer")
+    assert client_session.calls == 2
+
+
+async def test_get_airflow_uri_caches_missing_environments(monkeypatch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(airflow, "_missing_environments", cachetools.TTLCache(8, 60))
+    client_session = MockComposerSession(status=404)
+    client = airflow.Client(
+        await mocks.mock_credentials(), logging.getLogger(__name__), client_session
+    )
+
+    for _ in range(2):
+        with pytest.raises(Exception) as e:
+            await client.get_airflow_uri("missing-composer")
+        assert str(e.value) == "Error getting airflow uri: mock reason mock error"
+    assert client_session.calls == 1
@@ -0,0 +1,84 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import threading
+import unittest
+
+from dataproc_jupyter_plugin.commons import blocking
+
+
+class TestBlockingCallExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.executor = blocking.BlockingCallExecutor(max_workers=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    async def test_run(self):
+        loop_thread = threading.get_ident()
+        result = await self.executor.run(
+            lambda value: (value, threading.get_ident()), 1
+        )
+        self.assertEqual(result[0], 1)
+        self.assertNotEqual(result[1], loop_thread)
+
+    async def test_run_propagates_errors(self):
+        def _fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            await self.executor.run(_fail)
+        self.assertEqual(self.executor.metrics()["completed"], 1)
+
+    async def test_metrics(self):
+        release = threading.Event()
+        first = asyncio.ensure_future(self.executor.run(release.wait))
+        second = asyncio.ensure_future(self.executor.run(lambda: "done"))
+        await asyncio.sleep(0.05)
+
+        metrics = self.executor.metrics()
+        self.assertEqual(metrics["max_workers"], 1)
+        self.assertEqual(metrics["active"], 1)
+        self.assertEqual(metrics["queue_depth"], 1)
+
+        release.set()
+        self.assertEqual(await second, "done")
+        await first
+        metrics = self.executor.metrics()
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertEqual(metrics["completed"], 2)
+        self.assertGreater(metrics["max_wait_seconds"], 0)
+
+    async def test_cancel_queued_call(self):
+        release = threading.Event()
+        first = asyncio.ensure_future(self.executor.run(release.wait))
+        second = asyncio.ensure_future(self.executor.run(lambda: "done"))
+        await asyncio.sleep(0.05)
+
+        second.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await second
+        self.assertEqual(self.executor.metrics()["queue_depth"], 0)
+        release.set()
+        await first
+
+
+async def test_blocking_call_metrics(jp_fetch):
+    response = await jp_fetch("dataproc-plugin", "api/metrics/blockingCalls")
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert payload["max_workers"] == blocking.DEFAULT_MAX_WORKERS
+    assert payload["queue_depth"] == 0
@@ -20,12 +20,18 @@ from dataproc_jupyter_plugin.tests import mocks
 
 
 class MockClientSession:
+    def __init__(self, *args, **kwargs):
+        return
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, *args, **kwargs):
         return
 
+    async def close(self):
+        return
+
     def get(self, api_endpoint, headers=None):
         return mocks.MockResponse(
             {
@@ -12,8 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import datetime
 import os
 import unittest
+from unittest import mock
 
 from google.cloud.jupyter_config.config import clear_gcloud_cache
 
@@ -35,6 +38,7 @@ class TestGetCached(unittest.IsolatedAsyncioTestCase):
         for key in self._mock_cloudsdk_variables:
             os.environ[key] = self._mock_cloudsdk_variables[key]
         clear_gcloud_cache()
+        credentials.invalidate()
         return
 
     def tearDown(self):
@@ -43,6 +47,7 @@ class TestGetCached(unittest.IsolatedAsyncioTestCase):
         for key in self.original_cloudsdk_variables:
             os.environ[key] = self.original_cloudsdk_variables[key]
         clear_gcloud_cache()
+        credentials.invalidate()
         return
 
     async def test_get_cached(self):
@@ -53,3 +58,82 @@ class TestGetCached(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(cached["region_id"], "example-region")
         self.assertEqual(cached["config_error"], 0)
         self.assertEqual(cached["login_error"], 1)
+
+
+class TestCredentialsCache(unittest.IsolatedAsyncioTestCase):
+    _credentials = {
+        "project_id": "example-project",
+        "project_number": "12345",
+        "region_id": "example-region",
+        "access_token": "example-token",
+        "config_error": 0,
+        "login_error": 0,
+    }
+
+    def setUp(self):
+        credentials.invalidate()
+        self.resolve_calls = 0
+
+    def tearDown(self):
+        credentials.invalidate()
+
+    async def _mock_resolve(self):
+        self.resolve_calls += 1
+        await asyncio.sleep(0)
+        return dict(self._credentials)
+
+    def _mock_expiry(self, delta):
+        async def _expiry():
+            return datetime.datetime.now(datetime.timezone.utc) + delta
+
+        return _expiry
+
+    async def test_concurrent_callers_share_one_refresh(self):
+        with mock.patch.object(credentials, "_resolve", self._mock_resolve):
+            with mock.patch.object(
+                credentials,
+                "_gcp_token_expiry",
+                self._mock_expiry(datetime.timedelta(hours=1)),
+            ):
+                results = await asyncio.gather(
+                    *[credentials.get_cached() for _ in range(5)]
+                )
+                await credentials.get_cached()
+        self.assertEqual(self.resolve_calls, 1)
+        for result in results:
+            self.assertEqual(result["access_token"], "example-token")
+
+    async def test_refreshes_in_background_before_expiry(self):
+        with mock.patch.object(credentials, "_resolve", self._mock_resolve):
+            with mock.patch.object(
+                credentials,
+                "_gcp_token_expiry",
+                self._mock_expiry(datetime.timedelta(minutes=2)),
+            ):
+                await credentials.get_cached()
+                cached = await credentials.get_cached()
+                self.assertEqual(cached["access_token"], "example-token")
+                await asyncio.sleep(0.01)
+        self.assertEqual(self.resolve_calls, 2)
+
+    async def test_errors_are_not_cached(self):
+        async def _mock_resolve():
+            self.resolve_calls += 1
+            return dict(self._credentials, login_error=1)
+
+        with mock.patch.object(credentials, "_resolve", _mock_resolve):
+            await credentials.get_cached()
+            await credentials.get_cached()
+        self.assertEqual(self.resolve_calls, 2)
+
+    async def test_invalidate(self):
+        with mock.patch.object(credentials, "_resolve", self._mock_resolve):
+            with mock.patch.object(
+                credentials,
+                "_gcp_token_expiry",
+                self._mock_expiry(datetime.timedelta(hours=1)),
+            ):
+                await credentials.get_cached()
+                credentials.invalidate()
+                await credentials.get_cached()
+        self.assertEqual(self.resolve_calls, 2)
@@ -0,0 +1,77 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import timeit
+import unittest
+
+from dataproc_jupyter_plugin.commons import cron
+
+CRONS = [
+    "0 * * * *",
+    "0 0 * * *",
+    "*/5 * * * *",
+    "TZ=America/New_York 30 9 * * 1-5",
+]
+
+# A page of 1,000 schedules, most of which share a handful of crons.
+PAGE = [CRONS[i % len(CRONS)] for i in range(1000)]
+
+
+class TestCron(unittest.TestCase):
+    def setUp(self):
+        cron.cache_clear()
+
+    def test_normalize_cron(self):
+        self.assertEqual(cron.normalize_cron("0 * * * *"), (None, "0 * * * *"))
+        self.assertEqual(
+            cron.normalize_cron("TZ=America/New_York  0 0 * * *"),
+            ("America/New_York", "0 0 * * *"),
+        )
+
+    def test_describe_cron(self):
+        self.assertEqual(cron.describe_cron("0 * * * *"), "Every hour")
+        self.assertEqual(cron.describe_cron("TZ=UTC 0 * * * *"), "Every hour")
+        self.assertEqual(cron.describe_cron("TZ=UTC * * * * *", "1"), "run once")
+
+    def test_describe_cron_page_cache(self):
+        for value in PAGE:
+            cron.describe_cron(value)
+
+        info = cron.describe_cron.cache_info()
+        self.assertEqual(info.misses, len(CRONS))
+        self.assertEqual(info.hits, len(PAGE) - len(CRONS))
+
+    @unittest.skipUnless(
+        os.environ.get("DATAPROC_PLUGIN_BENCHMARKS"),
+        "set DATAPROC_PLUGIN_BENCHMARKS=1 to run benchmarks",
+    )
+    def test_describe_cron_page_benchmark(self):
+        """Prints the time to describe a page of schedules with and without the cache."""
+
+        def uncached():
+            for value in PAGE:
+                cron.describe_cron.__wrapped__(value)
+
+        def cached():
+            for value in PAGE:
+                cron.describe_cron(value)
+
+        uncached_time = min(timeit.repeat(uncached, number=1, repeat=5))
+        cached()
+        cached_time = min(timeit.repeat(cached, number=1, repeat=5))
+        print(
+            f"describe_cron over {len(PAGE)} schedules: "
+            f"uncached {uncached_time * 1000:.2f} ms, cached {cached_time * 1000:.2f} ms"
+        )
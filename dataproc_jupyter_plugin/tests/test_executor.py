@@ -12,9 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import json
 import subprocess
 import unittest
+import zipfile
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import aiohttp
@@ -22,9 +24,10 @@ import pytest
 from google.cloud import storage
 
 from dataproc_jupyter_plugin import credentials
-from dataproc_jupyter_plugin.commons import commands
+from dataproc_jupyter_plugin.commons import commands, gcs
 from dataproc_jupyter_plugin.services import airflow
 from dataproc_jupyter_plugin.services import executor
+from dataproc_jupyter_plugin.tests import mocks
 from dataproc_jupyter_plugin.tests.test_airflow import MockClientSession
 
 
@@ -103,8 +106,7 @@ async def test_download_dag_output(monkeypatch, returncode, expected_result, jp_
 
     monkeypatch.setattr(airflow.Client, "list_dag_run_task", mock_list_dag_run_task)
     monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
-    mock_blob = MagicMock()
-    mock_blob.download_as_bytes.return_value = b"mock file content"
+    mock_blob = mocks.MockBlob(b"mock file content")
 
     mock_bucket = MagicMock()
     mock_bucket.blob.return_value = mock_blob
@@ -136,6 +138,111 @@ async def test_download_dag_output(monkeypatch, returncode, expected_result, jp_
     assert payload["status"] == 0
 
 
+def patch_bulk_download(monkeypatch):
+    async def mock_list_dag_run_task(self, composer, dag_id, dag_run_id):
+        if dag_run_id == "missing":
+            raise Exception("Not found")
+
+    monkeypatch.setattr(airflow.Client, "list_dag_run_task", mock_list_dag_run_task)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
+    monkeypatch.setattr(credentials, "get_cached", mock_credentials)
+
+    def mock_blob(blob_name):
+        return mocks.MockBlob(blob_name.encode())
+
+    mock_bucket = MagicMock()
+    mock_bucket.blob.side_effect = mock_blob
+    mock_storage_client = MagicMock()
+    mock_storage_client.bucket.return_value = mock_bucket
+    monkeypatch.setattr(storage, "Client", lambda credentials=None: mock_storage_client)
+
+
+async def test_bulk_download_dag_outputs(monkeypatch, tmp_path, jp_fetch):
+    patch_bulk_download(monkeypatch)
+    monkeypatch.chdir(tmp_path)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "downloadOutputs",
+        method="POST",
+        body=json.dumps(
+            {
+                "composer": "mock-composer",
+                "bucket_name": "mock-bucket",
+                "runs": [
+                    {"dag_id": "mock-dag-id", "dag_run_id": "1"},
+                    {"dag_id": "mock-dag-id", "dag_run_id": "missing"},
+                    {"dag_id": "mock-dag-id", "dag_run_id": "2"},
+                    {"dag_id": "mock-dag-id", "dag_run_id": "1"},
+                ],
+            }
+        ),
+    )
+    assert response.code == 200
+    lines = [json.loads(line) for line in response.body.decode().splitlines()]
+    assert [line["completed"] for line in lines] == [1, 2, 3]
+    assert all(line["total"] == 3 for line in lines)
+    results = {line["dag_run_id"]: line for line in lines}
+    assert results["1"]["status"] == 0
+    assert results["2"]["status"] == 0
+    assert results["missing"]["error"] == "Invalid DAG run ID missing"
+    assert (tmp_path / "mock-dag-id_1.ipynb").read_bytes() == (
+        b"dataproc-output/mock-dag-id/output-notebooks/mock-dag-id_1.ipynb"
+    )
+
+
+async def test_bulk_download_dag_outputs_invalid_concurrency(monkeypatch, jp_fetch):
+    patch_bulk_download(monkeypatch)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "downloadOutputs",
+        method="POST",
+        body=json.dumps(
+            {
+                "composer": "mock-composer",
+                "bucket_name": "mock-bucket",
+                "runs": [{"dag_id": "mock-dag-id", "dag_run_id": "1"}],
+                "concurrency": 0,
+            }
+        ),
+    )
+    assert response.code == 200
+    assert json.loads(response.body) == {"error": "Invalid concurrency: 0"}
+
+
+async def test_bulk_download_dag_outputs_zip(monkeypatch, jp_fetch):
+    patch_bulk_download(monkeypatch)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "downloadOutputs",
+        method="POST",
+        body=json.dumps(
+            {
+                "composer": "mock-composer",
+                "bucket_name": "mock-bucket",
+                "runs": [
+                    {"dag_id": "mock-dag-id", "dag_run_id": "1"},
+                    {"dag_id": "mock-dag-id", "dag_run_id": "missing"},
+                ],
+                "zip": True,
+            }
+        ),
+    )
+    assert response.code == 200
+    assert response.headers["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.body)) as archive:
+        assert sorted(archive.namelist()) == ["manifest.json", "mock-dag-id_1.ipynb"]
+        assert archive.read("mock-dag-id_1.ipynb") == (
+            b"dataproc-output/mock-dag-id/output-notebooks/mock-dag-id_1.ipynb"
+        )
+        manifest = json.loads(archive.read("manifest.json"))
+    results = {result["dag_run_id"]: result for result in manifest}
+    assert results["1"]["archive_path"] == "mock-dag-id_1.ipynb"
+    assert "error" in results["missing"]
+
+
 async def test_invalid_composer_name(monkeypatch, jp_fetch):
     mock_composer_name = "mock_composer"
     mock_bucket_name = "mock-bucket"
@@ -230,3 +337,120 @@ async def test_invalid_dag_run_id(monkeypatch, jp_fetch):
     assert "status" not in payload
     assert "error" in payload
     assert "Invalid DAG Run ID" in payload["error"]
+
+
+def mock_job(name, composer_environment_name="mock-env"):
+    return {
+        "name": name,
+        "dag_id": f"{name}-dag",
+        "composer_environment_name": composer_environment_name,
+        "input_filename": f"gs://mock-bucket/{name}.ipynb",
+        "mode_selected": "cluster",
+        "cluster_name": "mock-cluster",
+        "schedule_value": "",
+        "time_zone": "",
+        "parameters": [],
+    }
+
+
+async def test_execute_batch(monkeypatch, tmp_path, jp_fetch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(credentials, "get_cached", mock_credentials)
+    monkeypatch.setattr(executor, "gcp_account", lambda: "mock-user@example.com")
+    resolved_environments = []
+    uploads = []
+
+    async def mock_get_bucket(self, runtime_env):
+        resolved_environments.append(runtime_env)
+        if runtime_env == "broken-env":
+            raise Exception("Error getting composer bucket")
+        return "mock-dag-bucket"
+
+    async def mock_check_file_exists(self, bucket_name, file_path):
+        return True
+
+    async def mock_upload_string(bucket_name, blob_name, data, credentials=None):
+        uploads.append((bucket_name, blob_name, data))
+        return True
+
+    monkeypatch.setattr(executor.Client, "get_bucket", mock_get_bucket)
+    monkeypatch.setattr(executor.Client, "check_file_exists", mock_check_file_exists)
+    monkeypatch.setattr(gcs, "upload_string", mock_upload_string)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "createJobSchedulerBatch",
+        method="POST",
+        body=json.dumps(
+            {
+                "jobs": [
+                    mock_job("job-1"),
+                    mock_job("invalid job"),
+                    mock_job("job-2", "broken-env"),
+                    mock_job("job-3"),
+                ]
+            }
+        ),
+    )
+    assert response.code == 200
+    results = json.loads(response.body)
+    assert [result["name"] for result in results] == [
+        "job-1",
+        "invalid job",
+        "job-2",
+        "job-3",
+    ]
+    assert results[0]["status"] == 0
+    assert "Invalid DAG ID" in results[1]["error"]
+    assert results[2]["error"] == "Error getting composer bucket"
+    assert results[3]["status"] == 0
+    assert sorted(resolved_environments) == ["broken-env", "mock-env"]
+    uploads.sort()
+    assert [upload[:2] for upload in uploads] == [
+        ("mock-dag-bucket", "dags/dag_job-1.json"),
+        ("mock-dag-bucket", "dags/dag_job-1.py"),
+        ("mock-dag-bucket", "dags/dag_job-3.json"),
+        ("mock-dag-bucket", "dags/dag_job-3.py"),
+    ]
+    assert json.loads(uploads[0][2])["input_filename"] == (
+        "gs://mock-bucket/job-1.ipynb"
+    )
+    assert json.loads(uploads[0][2])["schedule_value"] == "@once"
+    assert "gs://mock-bucket/job-1.ipynb" in uploads[1][2]
+    assert not (tmp_path / "scheduled-jobs").exists()
+
+
+async def test_execute_batch_malformed_jobs(monkeypatch, tmp_path, jp_fetch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(credentials, "get_cached", mock_credentials)
+    monkeypatch.setattr(executor, "gcp_account", lambda: "mock-user@example.com")
+    uploads = []
+
+    async def mock_get_bucket(self, runtime_env):
+        return "mock-dag-bucket"
+
+    async def mock_check_file_exists(self, bucket_name, file_path):
+        return True
+
+    async def mock_upload_string(bucket_name, blob_name, data, credentials=None):
+        uploads.append(blob_name)
+        return True
+
+    monkeypatch.setattr(executor.Client, "get_bucket", mock_get_bucket)
+    monkeypatch.setattr(executor.Client, "check_file_exists", mock_check_file_exists)
+    monkeypatch.setattr(gcs, "upload_string", mock_upload_string)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "createJobSchedulerBatch",
+        method="POST",
+        body=json.dumps({"jobs": ["not-a-job", mock_job("job-1"), None]}),
+    )
+    assert response.code == 200
+    results = json.loads(response.body)
+    assert len(results) == 3
+    assert "error" in results[0] and "name" not in results[0]
+    assert results[1]["status"] == 0
+    assert results[1]["name"] == "job-1"
+    assert "error" in results[2] and "name" not in results[2]
+    assert sorted(uploads) == ["dags/dag_job-1.json", "dags/dag_job-1.py"]
@@ -0,0 +1,182 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import MagicMock
+
+import pytest
+from google.cloud import storage
+
+from dataproc_jupyter_plugin.commons import gcs
+from dataproc_jupyter_plugin.tests import mocks
+
+CONTENT = b"0123456789" * 10
+
+
+def patch_storage(monkeypatch, blob):
+    mock_bucket = MagicMock()
+    mock_bucket.blob.return_value = blob
+    mock_storage_client = MagicMock()
+    mock_storage_client.bucket.return_value = mock_bucket
+    monkeypatch.setattr(storage, "Client", lambda credentials=None: mock_storage_client)
+
+
+async def test_download_to_file(monkeypatch, tmp_path):
+    blob = mocks.MockBlob(CONTENT)
+    patch_storage(monkeypatch, blob)
+    destination = tmp_path / "output.ipynb"
+
+    await gcs.download_to_file(None, "bucket", "output.ipynb", destination, 32)
+
+    assert destination.read_bytes() == CONTENT
+    assert blob.ranges == [(0, 31), (32, 63), (64, 95), (96, 99)]
+    assert not list(tmp_path.glob("*.part"))
+
+
+async def test_download_to_file_resumes(monkeypatch, tmp_path):
+    blob = mocks.MockBlob(CONTENT, generation=7)
+    patch_storage(monkeypatch, blob)
+    destination = tmp_path / "output.ipynb"
+    (tmp_path / "output.ipynb.7.part").write_bytes(CONTENT[:40])
+
+    await gcs.download_to_file(None, "bucket", "output.ipynb", destination, 32)
+
+    assert destination.read_bytes() == CONTENT
+    assert blob.ranges == [(40, 71), (72, 99)]
+
+
+async def test_download_to_file_checksum_mismatch(monkeypatch, tmp_path):
+    blob = mocks.MockBlob(CONTENT, generation=7)
+    patch_storage(monkeypatch, blob)
+    destination = tmp_path / "output.ipynb"
+    (tmp_path / "output.ipynb.7.part").write_bytes(b"corrupted!")
+
+    with pytest.raises(IOError, match="Checksum mismatch"):
+        await gcs.download_to_file(None, "bucket", "output.ipynb", destination, 32)
+    assert not destination.exists()
+    assert not list(tmp_path.glob("*.part"))
+
+
+class MockUploadBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.crc32c = None
+
+    def _store(self, data):
+        self.crc32c = gcs._crc32c(data)
+        self.bucket.objects[self.name] = (data, self)
+
+    def upload_from_filename(self, file_name):
+        self.bucket.uploads.append(self.name)
+        with open(file_name, "rb") as f:
+            self._store(f.read())
+
+    def upload_from_string(self, data, checksum=None):
+        data = data.encode() if isinstance(data, str) else data
+        self.bucket.uploads.append(self.name)
+        self._store(data)
+
+    def compose(self, sources):
+        self._store(b"".join(self.bucket.objects[part.name][0] for part in sources))
+
+
+class MockUploadBucket:
+    def __init__(self):
+        self.objects = {}
+        self.uploads = []
+
+    def blob(self, name):
+        return MockUploadBlob(self, name)
+
+    def get_blob(self, name):
+        if name in self.objects:
+            return self.objects[name][1]
+        return None
+
+    def delete_blobs(self, blobs, on_error=None):
+        for blob in blobs:
+            del self.objects[blob.name]
+
+
+def patch_upload_storage(monkeypatch):
+    bucket = MockUploadBucket()
+    mock_storage_client = MagicMock()
+    mock_storage_client.bucket.return_value = bucket
+    monkeypatch.setattr(storage, "Client", lambda credentials=None: mock_storage_client)
+    monkeypatch.setattr(gcs, "COMPOSITE_UPLOAD_PART_SIZE", 32)
+    return bucket
+
+
+async def test_upload_file(monkeypatch, tmp_path):
+    bucket = patch_upload_storage(monkeypatch)
+    source = tmp_path / "input.ipynb"
+    source.write_bytes(CONTENT)
+
+    await gcs.upload_file("bucket", "job/input.ipynb", str(source))
+
+    assert list(bucket.objects) == ["job/input.ipynb"]
+    assert bucket.objects["job/input.ipynb"][0] == CONTENT
+    assert gcs.upload_progress()["gs://bucket/job/input.ipynb"] == {
+        "uploaded_bytes": len(CONTENT),
+        "total_bytes": len(CONTENT),
+        "state": "done",
+    }
+
+
+async def test_upload_file_composite(monkeypatch, tmp_path):
+    bucket = patch_upload_storage(monkeypatch)
+    source = tmp_path / "input.ipynb"
+    source.write_bytes(CONTENT)
+    stat = source.stat()
+    parts_prefix = f"job/input.ipynb.parts/{stat.st_size}-{stat.st_mtime_ns}"
+    # A part left over from an earlier attempt is reused.
+    bucket.blob(f"{parts_prefix}/0001")._store(CONTENT[32:64])
+
+    await gcs.upload_file("bucket", "job/input.ipynb", str(source), threshold=64)
+
+    assert list(bucket.objects) == ["job/input.ipynb"]
+    assert bucket.objects["job/input.ipynb"][0] == CONTENT
+    assert sorted(bucket.uploads) == [
+        f"{parts_prefix}/0000",
+        f"{parts_prefix}/0002",
+        f"{parts_prefix}/0003",
+    ]
+    assert gcs.upload_progress()["gs://bucket/job/input.ipynb"]["state"] == "done"
+
+
+async def test_upload_file_unchanged(monkeypatch, tmp_path):
+    bucket = patch_upload_storage(monkeypatch)
+    monkeypatch.setattr(gcs, "_file_checksums", {})
+    source = tmp_path / "input.ipynb"
+    source.write_bytes(CONTENT)
+
+    assert await gcs.upload_file("bucket", "job/input.ipynb", str(source))
+    assert not await gcs.upload_file("bucket", "job/input.ipynb", str(source))
+    assert bucket.uploads == ["job/input.ipynb"]
+    assert len(gcs._file_checksums) == 1
+    assert gcs.upload_progress()["gs://bucket/job/input.ipynb"]["state"] == (
+        "unchanged"
+    )
+
+    source.write_bytes(CONTENT + b"changed")
+    assert await gcs.upload_file("bucket", "job/input.ipynb", str(source))
+    assert bucket.uploads == ["job/input.ipynb", "job/input.ipynb"]
+
+
+async def test_upload_string_unchanged(monkeypatch):
+    bucket = patch_upload_storage(monkeypatch)
+
+    assert await gcs.upload_string("bucket", "job/job.json", "gs://bucket/job")
+    assert not await gcs.upload_string("bucket", "job/job.json", "gs://bucket/job")
+    assert bucket.uploads == ["job/job.json"]
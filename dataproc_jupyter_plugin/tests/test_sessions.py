@@ -0,0 +1,40 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+
+from dataproc_jupyter_plugin.commons import sessions
+
+
+class TestClientSessionManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.manager = sessions.ClientSessionManager(
+            logging.getLogger(__name__), 10, 2, 30.0, 60
+        )
+
+    async def asyncTearDown(self):
+        await self.manager.close()
+
+    async def test_session_is_shared(self):
+        session = self.manager.get()
+        self.assertIs(self.manager.get(), session)
+        self.assertEqual(session.connector.limit, 10)
+        self.assertEqual(session.connector.limit_per_host, 2)
+
+    async def test_close_resets_session(self):
+        session = self.manager.get()
+        await self.manager.close()
+        self.assertTrue(session.closed)
+        self.assertIsNot(self.manager.get(), session)
@@ -0,0 +1,54 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from dataproc_jupyter_plugin.commons import tasks
+
+
+async def test_bounded_as_completed():
+    running = 0
+    max_running = 0
+
+    async def _work(delay, value):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(delay)
+        running -= 1
+        return value
+
+    results = [
+        result
+        async for result in tasks.bounded_as_completed(
+            [_work(0.03, "slow"), _work(0.01, "fast"), _work(0.01, "queued")], 2
+        )
+    ]
+    assert results == ["fast", "queued", "slow"]
+    assert max_running == 2
+
+
+async def test_bounded_as_completed_cancels_pending():
+    started = []
+
+    async def _work(value):
+        started.append(value)
+        await asyncio.sleep(0.01 * value)
+        return value
+
+    results = tasks.bounded_as_completed([_work(i) for i in range(1, 5)], 1)
+    assert await results.__anext__() == 1
+    await results.aclose()
+    await asyncio.sleep(0.05)
+    assert started == [1, 2]
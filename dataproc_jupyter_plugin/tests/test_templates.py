@@ -0,0 +1,41 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from dataproc_jupyter_plugin.commons import templates
+
+
+def test_load():
+    templates.load()
+    for name in templates.DAG_TEMPLATES:
+        assert templates.get_template(name) is templates.get_template(name)
+    assert os.path.isfile(templates.template_path("wrapper_papermill.py"))
+
+
+def test_reload_on_change(monkeypatch, tmp_path):
+    monkeypatch.setattr(templates, "_environment", templates._new_environment(tmp_path))
+    template_file = tmp_path / "template.txt"
+    template_file.write_text("Hello {{ name }}")
+
+    template = templates.get_template("template.txt")
+    assert template.render(name="DAG") == "Hello DAG"
+    assert templates.get_template("template.txt") is template
+
+    template_file.write_text("Goodbye {{ name }}")
+    stat = template_file.stat()
+    os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    reloaded = templates.get_template("template.txt")
+    assert reloaded is not template
+    assert reloaded.render(name="DAG") == "Goodbye DAG"
@@ -0,0 +1,59 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest import mock
+
+from google.cloud import jupyter_config
+
+from dataproc_jupyter_plugin import urls
+
+
+class TestServiceUrls(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        urls.invalidate()
+        self.config_calls = 0
+        self.overrides = {"dataproc": "https://dataproc.example.com/"}
+
+    def tearDown(self):
+        urls.invalidate()
+
+    async def _mock_config(self, field_name):
+        self.config_calls += 1
+        self.assertEqual(field_name, "configuration.properties.api_endpoint_overrides")
+        return self.overrides
+
+    async def test_map(self):
+        with mock.patch.object(
+            jupyter_config, "async_get_gcloud_config", self._mock_config
+        ):
+            url_map = await urls.map()
+            await urls.gcp_service_url("composer")
+        self.assertEqual(self.config_calls, 1)
+        self.assertEqual(url_map["dataproc_url"], "https://dataproc.example.com/")
+        self.assertEqual(url_map["metastore_url"], "https://metastore.googleapis.com/")
+        self.assertEqual(
+            url_map["storage_url"], "https://storage.googleapis.com/storage/v1/"
+        )
+
+    async def test_invalidate(self):
+        with mock.patch.object(
+            jupyter_config, "async_get_gcloud_config", self._mock_config
+        ):
+            await urls.gcp_service_url("dataproc")
+            self.overrides = {}
+            urls.invalidate()
+            url = await urls.gcp_service_url("dataproc")
+        self.assertEqual(self.config_calls, 2)
+        self.assertEqual(url, "https://dataproc.googleapis.com/")
@@ -0,0 +1,256 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import urllib.parse
+
+import aiohttp
+
+from dataproc_jupyter_plugin.services import vertex
+from dataproc_jupyter_plugin.tests import mocks
+
+
+def mock_schedule(schedule_id):
+    return {
+        "name": f"projects/credentials-project/locations/mock-region/schedules/{schedule_id}",
+        "displayName": f"schedule-{schedule_id}",
+        "cron": "0 * * * *",
+        "state": "ACTIVE",
+        "createTime": "2024-05-01T00:00:00Z",
+        "createNotebookExecutionJobRequest": {
+            "notebookExecutionJob": {
+                "gcsNotebookSource": {"uri": "gs://mock-bucket/mock.ipynb"}
+            }
+        },
+    }
+
+
+class MockClientSession(mocks.MockClientSession):
+    def get(self, api_endpoint, headers=None):
+        if "/notebookExecutionJobs" in api_endpoint:
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(api_endpoint).query)
+            schedule_id = query["filter"][0].split(" ")[0].split("=")[1]
+            if query.get("pageToken") == ["jobs-page-2"]:
+                return mocks.MockResponse(
+                    {"notebookExecutionJobs": [{"name": f"job-{schedule_id}-b"}]}
+                )
+            return mocks.MockResponse(
+                {
+                    "notebookExecutionJobs": [
+                        {"name": f"job-{schedule_id}", "filter": query["filter"][0]}
+                    ],
+                    "nextPageToken": "jobs-page-2",
+                }
+            )
+        if "pageToken=page-2" in api_endpoint:
+            return mocks.MockResponse({"schedules": [mock_schedule("3")]})
+        return mocks.MockResponse(
+            {
+                "schedules": [mock_schedule("1"), mock_schedule("2")],
+                "nextPageToken": "page-2",
+            }
+        )
+
+
+async def test_list_schedules(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "api/vertex/listSchedules",
+        params={"region_id": "mock-region"},
+    )
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert payload["nextPageToken"] == "page-2"
+    assert [schedule["displayName"] for schedule in payload["schedules"]] == [
+        "schedule-1",
+        "schedule-2",
+    ]
+    assert payload["schedules"][0]["schedule"] == "Every hour"
+
+
+async def test_list_all_schedules(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "api/vertex/listAllSchedules",
+        params={"region_id": "mock-region", "include_latest_job": "true"},
+    )
+    assert response.code == 200
+    pages = [json.loads(line) for line in response.body.decode().splitlines()]
+    assert len(pages) == 2
+    schedules = pages[0]["schedules"] + pages[1]["schedules"]
+    assert [schedule["displayName"] for schedule in schedules] == [
+        "schedule-1",
+        "schedule-2",
+        "schedule-3",
+    ]
+    assert [schedule["latestExecutionJob"]["name"] for schedule in schedules] == [
+        "job-1",
+        "job-2",
+        "job-3",
+    ]
+
+
+async def test_list_notebook_execution_jobs(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "api/vertex/listNotebookExecutionJobs",
+        params={
+            "region_id": "mock-region",
+            "schedule_id": "1",
+            "start_date": "2024-12-01T00:00:00.000Z",
+        },
+    )
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert [job["name"] for job in payload] == ["job-1", "job-1-b"]
+    assert payload[0]["filter"] == (
+        'schedule=1 AND createTime>="2024-12-01T00:00:00Z" '
+        'AND createTime<"2025-01-01T00:00:00Z"'
+    )
+
+
+async def test_list_notebook_execution_jobs_page(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockClientSession)
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "api/vertex/listNotebookExecutionJobs",
+        params={
+            "region_id": "mock-region",
+            "schedule_id": "1",
+            "start_date": "2024-05-01T00:00:00Z",
+            "end_date": "2024-05-02T00:00:00Z",
+            "page_size": "10",
+        },
+    )
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert payload["nextPageToken"] == "jobs-page-2"
+    assert [job["name"] for job in payload["notebookExecutionJobs"]] == ["job-1"]
+
+
+class MockScheduleActionSession(MockClientSession):
+    requests = []
+
+    def get(self, api_endpoint, headers=None):
+        self.requests.append(("GET", api_endpoint))
+        if "/schedules/" in api_endpoint:
+            return mocks.MockResponse(mock_schedule(api_endpoint.split("/")[-1]))
+        return super().get(api_endpoint, headers)
+
+    def post(self, api_endpoint, headers=None, json=None):
+        self.requests.append(("POST", api_endpoint))
+        if api_endpoint.endswith("/schedules/2:pause"):
+            return mocks.MockResponse(None, status=400, text="mock error")
+        return mocks.MockResponse({"name": "mock-response", "json": json})
+
+
+async def test_bulk_pause_schedules(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockScheduleActionSession)
+    monkeypatch.setattr(MockScheduleActionSession, "requests", [])
+    schedule_ids = [mock_schedule(i)["name"] for i in ("1", "2")]
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "api/vertex/bulkScheduleAction",
+        method="POST",
+        body=json.dumps(
+            {
+                "region_id": "mock-region",
+                "schedule_ids": schedule_ids,
+                "action": "pause",
+            }
+        ),
+    )
+
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert [result["schedule_id"] for result in payload] == schedule_ids
+    assert payload[0]["response"]["name"] == "mock-response"
+    assert payload[1]["error"].endswith("mock error")
+
+
+async def test_bulk_trigger_schedules(monkeypatch, jp_fetch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(aiohttp, "ClientSession", MockScheduleActionSession)
+    monkeypatch.setattr(MockScheduleActionSession, "requests", [])
+    schedule_ids = [mock_schedule(i)["name"] for i in ("1", "2", "1")]
+
+    response = await jp_fetch(
+        "dataproc-plugin",
+        "api/vertex/bulkScheduleAction",
+        method="POST",
+        body=json.dumps(
+            {
+                "region_id": "mock-region",
+                "schedule_ids": schedule_ids,
+                "action": "trigger",
+            }
+        ),
+    )
+
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert [result["schedule_id"] for result in payload] == schedule_ids
+    assert [
+        result["response"]["json"]["scheduleResourceName"] for result in payload
+    ] == schedule_ids
+    # Each schedule is fetched once and its payload reused for the trigger.
+    gets = sorted(
+        url for method, url in MockScheduleActionSession.requests if method == "GET"
+    )
+    assert gets == [
+        f"https://mock-region-aiplatform.googleapis.com/v1/{schedule_id}"
+        for schedule_id in schedule_ids[:2]
+    ]
+
+
+class MockBucketSession:
+    def __init__(self):
+        self.api_endpoints = []
+
+    def get(self, api_endpoint, headers=None):
+        self.api_endpoints.append(api_endpoint)
+        if "/b/existing-bucket" in api_endpoint:
+            return mocks.MockResponse({"name": "existing-bucket"})
+        return mocks.MockResponse({}, status=404)
+
+
+async def test_check_bucket_exists(monkeypatch):
+    mocks.patch_mocks(monkeypatch)
+    monkeypatch.setattr(vertex, "_existing_buckets", set())
+    client_session = MockBucketSession()
+    client = vertex.Client(
+        await mocks.mock_credentials(), logging.getLogger(__name__), client_session
+    )
+
+    assert await client.check_bucket_exists("existing-bucket")
+    assert await client.check_bucket_exists("existing-bucket")
+    assert not await client.check_bucket_exists("missing-bucket")
+    assert client_session.api_endpoints == [
+        "https://storage.googleapis.com/storage/v1/b/existing-bucket?fields=name",
+        "https://storage.googleapis.com/storage/v1/b/missing-bucket?fields=name",
+    ]
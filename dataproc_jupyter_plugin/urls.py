@@ -25,35 +25,52 @@ from dataproc_jupyter_plugin.commons.constants import (
     STORAGE_SERVICE_NAME,
 )
 
+# The `api_endpoint_overrides` section of the gcloud config, read once and
+# kept until the gcloud configuration is changed through the plugin.
+_endpoint_overrides = None
+
+
+async def _api_endpoint_overrides():
+    global _endpoint_overrides
+    if _endpoint_overrides is None:
+        overrides = await jupyter_config.async_get_gcloud_config(
+            "configuration.properties.api_endpoint_overrides"
+        )
+        _endpoint_overrides = overrides or {}
+    return _endpoint_overrides
+
+
+def invalidate():
+    """Drops the memoized endpoint overrides so they are re-read from gcloud."""
+    global _endpoint_overrides
+    _endpoint_overrides = None
+
 
 async def map():
-    dataproc_url = await gcp_service_url(DATAPROC_SERVICE_NAME)
-    compute_url = await gcp_service_url(
-        COMPUTE_SERVICE_NAME, default_url=COMPUTE_SERVICE_DEFAULT_URL
-    )
-    metastore_url = await gcp_service_url(METASTORE_SERVICE_NAME)
-    cloudkms_url = await gcp_service_url(CLOUDKMS_SERVICE_NAME)
-    cloudresourcemanager_url = await gcp_service_url(CLOUDRESOURCEMANAGER_SERVICE_NAME)
-    datacatalog_url = await gcp_service_url(DATACATALOG_SERVICE_NAME)
-    storage_url = await gcp_service_url(
-        STORAGE_SERVICE_NAME, default_url=STORAGE_SERVICE_DEFAULT_URL
-    )
+    overrides = await _api_endpoint_overrides()
+
+    def service_url(service_name, default_url=None):
+        default_url = default_url or f"https://{service_name}.googleapis.com/"
+        return overrides.get(service_name) or default_url
+
     url_map = {
-        "dataproc_url": dataproc_url,
-        "compute_url": compute_url,
-        "metastore_url": metastore_url,
-        "cloudkms_url": cloudkms_url,
-        "cloudresourcemanager_url": cloudresourcemanager_url,
-        "datacatalog_url": datacatalog_url,
-        "storage_url": storage_url,
+        "dataproc_url": service_url(DATAPROC_SERVICE_NAME),
+        "compute_url": service_url(
+            COMPUTE_SERVICE_NAME, default_url=COMPUTE_SERVICE_DEFAULT_URL
+        ),
+        "metastore_url": service_url(METASTORE_SERVICE_NAME),
+        "cloudkms_url": service_url(CLOUDKMS_SERVICE_NAME),
+        "cloudresourcemanager_url": service_url(CLOUDRESOURCEMANAGER_SERVICE_NAME),
+        "datacatalog_url": service_url(DATACATALOG_SERVICE_NAME),
+        "storage_url": service_url(
+            STORAGE_SERVICE_NAME, default_url=STORAGE_SERVICE_DEFAULT_URL
+        ),
     }
     return url_map
 
 
 async def gcp_service_url(service_name, default_url=None):
     default_url = default_url or f"https://{service_name}.googleapis.com/"
-    configured_url = await jupyter_config.async_get_gcloud_config(
-        f"configuration.properties.api_endpoint_overrides.{service_name}"
-    )
-    url = configured_url or default_url
+    overrides = await _api_endpoint_overrides()
+    url = overrides.get(service_name) or default_url
     return url